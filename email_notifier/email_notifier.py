@@ -2,13 +2,26 @@
 Email Notifier Module for Payment Reminder App
 Handles sending notification emails to customers about payment status
 """
+import asyncio
 import smtplib
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email import policy
+from email.message import EmailMessage
 import logging
 from datetime import datetime
 import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import aiosmtplib
+except ImportError:
+    # Optional: only the async send methods need it
+    aiosmtplib = None
 
 # Configure logging
 logging.basicConfig(
@@ -18,8 +31,362 @@ logging.basicConfig(
 )
 logger = logging.getLogger('email_notifier')
 
+# SMTP line endings and header folding; non-ASCII bodies are base64/QP encoded
+# so messages are valid even on servers without 8BITMIME
+_MESSAGE_POLICY = policy.SMTP.clone(cte_type='7bit')
+
+# Loose address check (something@domain.tld, no spaces) to reject junk before any SMTP round trip
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+# Stand-in for the To header in prebuilt messages, replaced per recipient
+_TO_PLACEHOLDER = "recipient@placeholder.invalid"
+_TO_PLACEHOLDER_BYTES = _TO_PLACEHOLDER.encode()
+
+# Email body templates, rendered with str.format_map(). They are static
+# text: every value that changes per email must be passed in the context.
+_REMINDER_TEXT_TMPL = """
+Dear {customer_name},
+
+This is a friendly reminder that a payment of {amount_str} is due on {due_date_str}.
+
+Please ensure timely payment to avoid any inconvenience.
+
+If you have already made the payment, please disregard this message.
+
+Best regards,
+{company_name}
+"""
+
+_REMINDER_HTML_TMPL = """
+<html>
+<head></head>
+<body>
+  <p>Dear {customer_name},</p>
+  
+  <p>This is a friendly reminder that a payment of <strong>{amount_str}</strong> is due on <strong>{due_date_str}</strong>.</p>
+  
+  <p>Please ensure timely payment to avoid any inconvenience.</p>
+  
+  <p>If you have already made the payment, please disregard this message.</p>
+  
+  <p>Best regards,<br>
+  {company_name}</p>
+</body>
+</html>
+"""
+
+_CONFIRMATION_TEXT_TMPL = """
+Dear {customer_name},
+
+We have received your payment of {amount_str} on {payment_date_str}.
+
+Thank you for your prompt payment.
+
+Best regards,
+{company_name}
+"""
+
+_CONFIRMATION_HTML_TMPL = """
+<html>
+<head></head>
+<body>
+  <p>Dear {customer_name},</p>
+  
+  <p>We have received your payment of <strong>{amount_str}</strong> on <strong>{payment_date_str}</strong>.</p>
+  
+  <p>Thank you for your prompt payment.</p>
+  
+  <p>Best regards,<br>
+  {company_name}</p>
+</body>
+</html>
+"""
+
+# Secure SSL context shared by all connections. Building one loads the system
+# CA bundle from disk, so it is done once; wrapping sockets with it is thread-safe.
+# starttls() sends the server hostname for SNI and certificate checks.
+_SSL_CONTEXT = ssl.create_default_context()
+
+# Concurrent connections used by the async send path
+_ASYNC_MAX_CONNECTIONS = 10
+
+# Batch sends stop once this many were attempted and a third or more failed
+_ABORT_MIN_BATCH = 30
+
+# Backoff for temporary (4xx) rejections: first delay and total time per batch, in seconds
+_BACKOFF_INITIAL = 1.0
+_BACKOFF_BUDGET = 60.0
+
+def _clean_email(value):
+    """
+    Strip a recipient address and check it against _EMAIL_RE
+    
+    The whole address must match, so a trailing newline (common in Excel
+    cells) can't end up in the To header and cut the headers short.
+    
+    Returns:
+        str: The stripped address, or None if it isn't usable
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value if _EMAIL_RE.fullmatch(value) else None
+
+def _is_transient(error):
+    """Check if an SMTP error is a temporary (4xx) rejection worth retrying"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and 400 <= error.smtp_code < 500
+
+class _BatchGuard:
+    """Shared state of one batch send: failure counts and the backoff budget"""
+    def __init__(self, min_batch=_ABORT_MIN_BATCH, backoff_budget=_BACKOFF_BUDGET):
+        self.min_batch = min_batch
+        self.backoff_left = backoff_budget
+        self.total = 0
+        self.failed = 0
+        self.aborted = threading.Event()
+        self._lock = threading.Lock()
+    
+    def record(self, ok):
+        """Count one send and abort the batch if the failure rate is too high"""
+        with self._lock:
+            self.total += 1
+            if not ok:
+                self.failed += 1
+            if (self.total >= self.min_batch and self.failed * 3 >= self.total
+                    and not self.aborted.is_set()):
+                logger.error(f"Aborting batch, failure rate too high ({self.failed} of {self.total} failed)")
+                self.aborted.set()
+    
+    def reserve_backoff(self, delay):
+        """
+        Take up to `delay` seconds from the backoff budget
+        
+        Returns:
+            float: Seconds to wait, or 0 if the budget is spent or the batch was aborted
+        """
+        with self._lock:
+            if self.aborted.is_set():
+                return 0
+            wait = min(delay, self.backoff_left)
+            self.backoff_left -= wait
+            return wait
+
+class _ResumingContext:
+    """Wraps an SSLContext so that wrap_socket() offers a saved TLS session"""
+    def __init__(self, context, session):
+        self._context = context
+        self._session = session
+    
+    def wrap_socket(self, sock, **kwargs):
+        return self._context.wrap_socket(sock, session=self._session, **kwargs)
+
+class _PipeliningSMTP(smtplib.SMTP):
+    """
+    SMTP client that pipelines the message envelope (RFC 2920)
+    
+    When the server advertises PIPELINING, MAIL FROM and every RCPT TO are
+    written in one packet and their replies are read afterwards, instead of
+    waiting a round trip for each command. Failed transactions are cleared
+    with RSET so the connection can carry the next message.
+    """
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if mail_options or rcpt_options or not self.has_extn('pipelining'):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+        
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        
+        commands = [f"mail FROM:{smtplib.quoteaddr(from_addr)}"]
+        commands += [f"rcpt TO:{smtplib.quoteaddr(addr)}" for addr in to_addrs]
+        self.send("".join(command + smtplib.CRLF for command in commands))
+        
+        # Replies come back in command order; read all of them before acting
+        mail_code, mail_resp = self.getreply()
+        senderrs = {}
+        for addr in to_addrs:
+            code, resp = self.getreply()
+            if code not in (250, 251):
+                senderrs[addr] = (code, resp)
+        
+        # A 421 on any reply means the server is closing the channel, so give
+        # up on the message like smtplib does rather than send DATA or RSET
+        closing = any(code == 421 for code, _ in senderrs.values())
+        if mail_code != 250:
+            self._abort_transaction(421 if closing else mail_code)
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if closing:
+            self._abort_transaction(421)
+            raise smtplib.SMTPRecipientsRefused(senderrs)
+        if len(senderrs) == len(to_addrs):
+            self._abort_transaction(max(code for code, _ in senderrs.values()))
+            raise smtplib.SMTPRecipientsRefused(senderrs)
+        
+        code, resp = self.data(msg)
+        if code != 250:
+            self._abort_transaction(code)
+            raise smtplib.SMTPDataError(code, resp)
+        return senderrs
+    
+    def starttls(self, context=None, session=None):
+        """
+        Upgrade to TLS, offering a previous TLS session for resumption
+        
+        Resuming skips the certificate exchange and key agreement of a full
+        handshake. If the server declines, a full handshake happens as usual.
+        """
+        if session is not None and context is not None:
+            context = _ResumingContext(context, session)
+        return super().starttls(context=context)
+    
+    def _abort_transaction(self, code):
+        """Reset the failed transaction, or close if the server is shutting down"""
+        if code == 421:
+            self.close()
+        else:
+            self._rset()
+
+class SMTPPool:
+    """
+    Thread-safe pool of logged-in SMTP connections
+    
+    Connections are created on demand up to `size` and handed out one caller
+    at a time. Each connection is retired after `max_msgs` messages, since
+    providers throttle or drop long-lived connections.
+    """
+    # Connections idle for less than this many seconds skip the NOOP check
+    idle_check_after = 5.0
+    
+    def __init__(self, connect, size=5, max_msgs=100):
+        """
+        Initialize the pool
+        
+        Args:
+            connect (callable): Returns a new, logged-in smtplib.SMTP instance
+            size (int): Maximum number of open connections
+            max_msgs (int): Messages sent on a connection before it is replaced
+        """
+        self._connect = connect
+        self.size = size
+        self.max_msgs = max_msgs
+        # Idle connections, plus a None for each freed slot to wake a waiting acquire()
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._open = 0
+    
+    def acquire(self):
+        """
+        Check out a live connection, blocking if all connections are in use
+        
+        Returns:
+            smtplib.SMTP: A logged-in SMTP connection
+        """
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._open < self.size
+                    if can_open:
+                        self._open += 1
+                if can_open:
+                    return self._new_conn()
+                conn = self._idle.get()
+            
+            # A slot was freed; go back and open a connection in it
+            if conn is None:
+                continue
+            
+            # A connection used moments ago is trusted; anything older gets a NOOP
+            if time.monotonic() - conn._last_used < self.idle_check_after:
+                return conn
+            try:
+                if conn.noop()[0] == 250:
+                    return conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(conn)
+    
+    def release(self, conn, broken=False):
+        """
+        Return a connection to the pool after one message was sent on it
+        
+        Args:
+            conn (smtplib.SMTP): Connection obtained from acquire()
+            broken (bool): True if the connection must not be reused
+        """
+        conn._msg_count += 1
+        conn._last_used = time.monotonic()
+        
+        # A connection closed after a 421 reply has no socket left to reuse
+        if broken or conn.sock is None or conn._msg_count >= self.max_msgs:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Context manager that acquires a connection and releases it afterwards"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except smtplib.SMTPServerDisconnected:
+            self.release(conn, broken=True)
+            raise
+        except smtplib.SMTPException:
+            # The transaction was reset; the connection itself is still usable
+            self.release(conn)
+            raise
+        except OSError:
+            self.release(conn, broken=True)
+            raise
+        except Exception:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+    
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                self._discard(conn)
+    
+    def _new_conn(self):
+        """Open a new connection, counting it against the pool size"""
+        try:
+            conn = self._connect()
+        except Exception:
+            self._free_slot()
+            raise
+        conn._msg_count = 0
+        conn._last_used = time.monotonic()
+        return conn
+    
+    def _discard(self, conn):
+        """Close a connection and free its slot in the pool"""
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+        finally:
+            self._free_slot()
+    
+    def _free_slot(self):
+        """Give up a connection's slot and wake an acquire() waiting for one"""
+        with self._lock:
+            self._open -= 1
+        self._idle.put(None)
+
 class EmailNotifier:
-    def __init__(self, smtp_server=None, sender_email=None, app_password=None):
+    def __init__(self, smtp_server=None, sender_email=None, app_password=None,
+                 pool_size=5, max_msgs_per_conn=100):
         """
         Initialize the EmailNotifier with SMTP server details
         
@@ -27,6 +394,8 @@ class EmailNotifier:
             smtp_server (str, optional): SMTP server address (default is Gmail)
             sender_email (str, optional): Sender's email address
             app_password (str, optional): App password for sender's account
+            pool_size (int, optional): Maximum number of concurrent SMTP connections
+            max_msgs_per_conn (int, optional): Messages sent before a connection is recycled
         """
         # Use provided values or try to get from environment variables
         self.smtp_server = smtp_server or os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
@@ -35,12 +404,148 @@ class EmailNotifier:
         self.app_password = app_password or os.environ.get('EMAIL_APP_PASSWORD', '')
         self.company_name = os.environ.get('COMPANY_NAME', 'Our Company')
         
+        # Persistent SMTP connections, opened lazily on first send
+        self.pool = SMTPPool(self._connect, size=pool_size, max_msgs=max_msgs_per_conn)
+        
+        # Last TLS session, offered for resumption when a new connection is opened
+        self._tls_session = None
+        
         # Check if credentials are set
         self.is_configured = bool(self.sender_email and self.app_password)
         
         if not self.is_configured:
             logger.warning("Email notifier not configured. Emails will not be sent.")
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def _connect(self):
+        """
+        Open a new SMTP connection and log in
+        
+        Returns:
+            smtplib.SMTP: A logged-in SMTP connection
+        """
+        smtp = _PipeliningSMTP(self.smtp_server, self.smtp_port)
+        try:
+            smtp.ehlo()
+            smtp.starttls(context=_SSL_CONTEXT, session=self._tls_session)
+            smtp.ehlo()
+            smtp.login(self.sender_email, self.app_password)
+        except Exception:
+            smtp.close()
+            raise
+        
+        # Keep the TLS session for the next connection to resume. It is read after
+        # login because TLS 1.3 servers send session tickets after the handshake.
+        resumed = smtp.sock.session_reused
+        if smtp.sock.session is not None:
+            self._tls_session = smtp.sock.session
+        
+        logger.info(f"Connected to SMTP server {self.smtp_server}" + (" (TLS session resumed)" if resumed else ""))
+        return smtp
+    
+    def _sendmail(self, to_email, message):
+        """Send a serialized message over a pooled connection, retrying once on disconnect"""
+        try:
+            with self.pool.connection() as server:
+                server.sendmail(self.sender_email, to_email, message)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError):
+            with self.pool.connection() as server:
+                server.sendmail(self.sender_email, to_email, message)
+    
+    def close(self):
+        """Close all idle SMTP connections"""
+        self.pool.close()
+    
+    def build_message(self, subject, body_text, body_html=None):
+        """
+        Serialize an email once so it can be sent to any number of recipients
+        
+        The To header holds a placeholder that send_prebuilt() fills in per
+        recipient, so structurally identical emails are only MIME-encoded once.
+        
+        Args:
+            subject (str): Email subject
+            body_text (str): Plain text email body
+            body_html (str, optional): HTML email body
+            
+        Returns:
+            bytes: The serialized message
+        """
+        # Build the message with the modern email API; it serializes in one pass
+        message = EmailMessage(policy=_MESSAGE_POLICY)
+        message["Subject"] = subject
+        message["From"] = f"{self.company_name} <{self.sender_email}>"
+        message["To"] = _TO_PLACEHOLDER
+        
+        # Add plain text part
+        message.set_content(body_text)
+        
+        # Add HTML part if provided
+        if body_html:
+            message.add_alternative(body_html, subtype="html")
+        
+        return message.as_bytes()
+    
+    def send_prebuilt(self, to_email, message):
+        """
+        Send a message built by build_message() to one recipient
+        
+        Args:
+            to_email (str): Recipient's email address
+            message (bytes): Serialized message from build_message()
+            
+        Returns:
+            bool: True if email sent successfully, False otherwise
+        """
+        # Check if email notifier is configured
+        if not self.is_configured:
+            logger.warning("Email notifier not configured. Email not sent.")
+            return False
+        
+        return self._send_prebuilt(to_email, message)
+    
+    def _send_prebuilt(self, to_email, message, guard=None):
+        """
+        Validate the recipient and send a prebuilt message, never raising
+        
+        When a batch guard is given, temporary (4xx) rejections are retried
+        with exponential backoff drawn from the guard's time budget.
+        """
+        # Validate recipient email
+        address = _clean_email(to_email)
+        if address is None:
+            logger.error(f"Invalid recipient email: {to_email!r}")
+            return False
+        to_email = address
+        
+        # Fill in the recipient
+        data = message.replace(_TO_PLACEHOLDER_BYTES, to_email.encode(), 1)
+        delay = _BACKOFF_INITIAL
+        
+        while True:
+            try:
+                # Send over a pooled connection
+                self._sendmail(to_email, data)
+                
+                logger.info(f"Email sent successfully to {to_email}")
+                return True
+                
+            except Exception as e:
+                wait = guard.reserve_backoff(delay) if guard and _is_transient(e) else 0
+                if wait <= 0:
+                    logger.error(f"Failed to send email: {str(e)}")
+                    return False
+                
+                logger.warning(f"Server deferred email to {to_email}: {str(e)}. Retrying in {wait:.1f}s")
+                time.sleep(wait)
+                delay *= 2
+    
     def send_email(self, to_email, subject, body_text, body_html=None):
         """
         Send an email via SMTP
@@ -59,57 +564,259 @@ class EmailNotifier:
             logger.warning("Email notifier not configured. Email not sent.")
             return False
         
-        # Validate recipient email
-        if not to_email or '@' not in to_email:
-            logger.error(f"Invalid recipient email: {to_email}")
+        try:
+            message = self.build_message(subject, body_text, body_html)
+        except Exception as e:
+            logger.error(f"Failed to build email: {str(e)}")
             return False
         
-        try:
-            # Create a multipart message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{self.company_name} <{self.sender_email}>"
-            message["To"] = to_email
+        return self.send_prebuilt(to_email, message)
+    
+    def send_many(self, messages):
+        """
+        Send several emails back-to-back over the pooled connections
+        
+        A refused sender, recipient or message only resets the SMTP
+        transaction, so the rest of the messages reuse the same connection.
+        
+        Args:
+            messages (iterable): Tuples of (to_email, subject, body_text[, body_html])
             
-            # Add plain text part
-            part1 = MIMEText(body_text, "plain")
-            message.attach(part1)
+        Returns:
+            int: Number of emails sent successfully
+        """
+        if not self.is_configured:
+            logger.warning("Email notifier not configured. Emails not sent.")
+            return 0
+        
+        sent = 0
+        for message in messages:
+            if self.send_email(*message):
+                sent += 1
+        
+        logger.info(f"Sent {sent} email(s)")
+        return sent
+    
+    def send_batch(self, entries):
+        """
+        Send payment reminders for many payment entries concurrently
+        
+        Each worker thread checks out its own pooled connection, so up to
+        pool size reminders are in flight at once. Entries without a valid
+        email address are filtered out before sending. Temporary (4xx)
+        rejections such as rate limits are retried with backoff, and the batch
+        stops early if a third or more of the sends fail once at least 30 have
+        been attempted.
+        
+        Args:
+            entries (iterable): Payment entry dicts with 'Email', 'Name', 'Amount',
+                'Due Date' and optionally 'city'
             
-            # Add HTML part if provided
-            if body_html:
-                part2 = MIMEText(body_html, "html")
-                message.attach(part2)
+        Returns:
+            int: Number of reminders sent successfully
+        """
+        if not self.is_configured:
+            logger.warning("Email notifier not configured. Emails not sent.")
+            return 0
+        
+        # Drop entries without a usable address before any SMTP work
+        entries = list(entries)
+        valid = [entry for entry in entries
+                 if _clean_email(entry.get('Email')) is not None]
+        if len(valid) < len(entries):
+            logger.warning(f"Skipping {len(entries) - len(valid)} entry(ies) without a valid email address")
+        entries = valid
+        if not entries:
+            return 0
+        
+        guard = _BatchGuard()
+        
+        def send(entry):
+            # Once the batch is aborted, the remaining entries are skipped
+            if guard.aborted.is_set():
+                return False
+            ok = self._send_entry_reminder(entry, guard)
+            guard.record(ok)
+            return ok
+        
+        with ThreadPoolExecutor(max_workers=min(self.pool.size, len(entries))) as executor:
+            sent = sum(executor.map(send, entries))
+        
+        logger.info(f"Sent {sent} of {len(entries)} payment reminder(s)")
+        return sent
+    
+    def _send_entry_reminder(self, entry, guard=None):
+        """Send the reminder for one payment entry, never raising"""
+        try:
+            subject, body_text, body_html = self._render_reminder(
+                entry.get('Name', ''),
+                float(entry.get('Amount', 0)),
+                entry.get('Due Date')
+            )
+            message = self.build_message(subject, body_text, body_html)
+        except Exception as e:
+            logger.error(f"Failed to build reminder for {entry.get('Email')}: {str(e)}")
+            return False
+        
+        return self._send_prebuilt(entry['Email'], message, guard)
+    
+    async def _connect_async(self):
+        """
+        Open a new aiosmtplib connection and log in
+        
+        Returns:
+            aiosmtplib.SMTP: A logged-in async SMTP connection
+        """
+        smtp = aiosmtplib.SMTP(hostname=self.smtp_server, port=self.smtp_port,
+                               start_tls=True, tls_context=_SSL_CONTEXT)
+        await smtp.connect()
+        try:
+            await smtp.login(self.sender_email, self.app_password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+    
+    async def send_email_async(self, to_email, subject, body_text, body_html=None):
+        """
+        Send one email without blocking the event loop
+        
+        Args:
+            to_email (str): Recipient's email address
+            subject (str): Email subject
+            body_text (str): Plain text email body
+            body_html (str, optional): HTML email body
             
-            # Create secure SSL context
-            context = ssl.create_default_context()
+        Returns:
+            bool: True if email sent successfully, False otherwise
+        """
+        return await self.send_many_async([(to_email, subject, body_text, body_html)]) == 1
+    
+    async def send_many_async(self, messages, max_connections=_ASYNC_MAX_CONNECTIONS):
+        """
+        Send several emails concurrently over up to `max_connections` connections
+        
+        Each connection is opened once and then drains a shared queue, so slow
+        server replies on one socket overlap with sends on the others. Only
+        aiosmtplib is used here; blocking smtplib calls would stall the loop.
+        
+        Args:
+            messages (iterable): Tuples of (to_email, subject, body_text[, body_html])
+            max_connections (int, optional): Maximum number of concurrent connections
             
-            # Connect to SMTP server
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.ehlo()  # Can be omitted
-                server.starttls(context=context)
-                server.ehlo()  # Can be omitted
-                server.login(self.sender_email, self.app_password)
-                server.sendmail(self.sender_email, to_email, message.as_string())
+        Returns:
+            int: Number of emails sent successfully
+        """
+        if aiosmtplib is None:
+            logger.error("aiosmtplib is not installed. Install it with: pip install aiosmtplib")
+            return 0
+        if not self.is_configured:
+            logger.warning("Email notifier not configured. Emails not sent.")
+            return 0
+        
+        pending = asyncio.Queue()
+        for to_email, subject, body_text, *rest in messages:
+            address = _clean_email(to_email)
+            if address is None:
+                logger.error(f"Invalid recipient email: {to_email!r}")
+                continue
+            to_email = address
+            message = self.build_message(subject, body_text, *rest)
+            pending.put_nowait((to_email, message.replace(_TO_PLACEHOLDER_BYTES, to_email.encode(), 1)))
+        
+        if pending.empty():
+            return 0
+        
+        async def worker():
+            sent = 0
+            try:
+                smtp = await self._connect_async()
+            except Exception as e:
+                logger.error(f"Failed to connect to SMTP server: {str(e)}")
+                return sent
             
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
+            try:
+                while not pending.empty():
+                    to_email, data = pending.get_nowait()
+                    try:
+                        try:
+                            await smtp.sendmail(self.sender_email, [to_email], data)
+                        except aiosmtplib.SMTPServerDisconnected:
+                            # Reconnect once and retry this message; if that fails, leave
+                            # the rest of the queue to the other workers
+                            smtp.close()
+                            try:
+                                smtp = await self._connect_async()
+                            except Exception as e:
+                                logger.error(f"Failed to reconnect to SMTP server: {str(e)}")
+                                return sent
+                            await smtp.sendmail(self.sender_email, [to_email], data)
+                        logger.info(f"Email sent successfully to {to_email}")
+                        sent += 1
+                    except aiosmtplib.SMTPServerDisconnected as e:
+                        logger.error(f"SMTP connection lost: {str(e)}")
+                        return sent
+                    except aiosmtplib.SMTPException as e:
+                        logger.error(f"Failed to send email: {str(e)}")
+            finally:
+                if smtp.is_connected:
+                    try:
+                        await smtp.quit()
+                    except aiosmtplib.SMTPException:
+                        smtp.close()
+            return sent
+        
+        workers = min(max_connections, pending.qsize())
+        results = await asyncio.gather(*(worker() for _ in range(workers)))
+        return sum(results)
+    
+    def send_many_concurrent(self, messages, max_connections=_ASYNC_MAX_CONNECTIONS):
+        """
+        Blocking wrapper around send_many_async() for synchronous callers
+        
+        Must not be called from inside a running event loop; await
+        send_many_async() directly there.
+        
+        Args:
+            messages (iterable): Tuples of (to_email, subject, body_text[, body_html])
+            max_connections (int, optional): Maximum number of concurrent connections
             
-        except Exception as e:
-            logger.error(f"Failed to send email: {str(e)}")
-            return False
+        Returns:
+            int: Number of emails sent successfully
+        """
+        return asyncio.run(self.send_many_async(messages, max_connections))
     
-    def send_payment_reminder(self, customer_name, amount, due_date, city=None):
+    def send_payment_reminder(self, to_email, customer_name, amount, due_date, city=None):
         """
         Send a payment reminder email
         
         Args:
+            to_email (str or list): Recipient's email address, or several addresses
+                that all receive the same reminder
             customer_name (str): Customer's name
             amount (float): Amount due
             due_date (date): Payment due date
             city (str, optional): City name for reference
             
         Returns:
-            bool: True if email sent successfully, False otherwise
+            bool: True if all emails sent successfully, False otherwise
+        """
+        subject, body_text, body_html = self._render_reminder(customer_name, amount, due_date)
+        
+        if isinstance(to_email, str):
+            return self.send_email(to_email=to_email, subject=subject, body_text=body_text, body_html=body_html)
+        
+        # Serialize once and only swap the recipient for each send
+        message = self.build_message(subject, body_text, body_html)
+        results = [self.send_prebuilt(address, message) for address in to_email]
+        return all(results)
+    
+    def _render_reminder(self, customer_name, amount, due_date):
+        """
+        Render the subject and bodies of a payment reminder
+        
+        Returns:
+            tuple: (subject, body_text, body_html)
         """
         # Format due date
         if hasattr(due_date, 'strftime'):
@@ -123,41 +830,17 @@ class EmailNotifier:
         # Create subject
         subject = f"Payment Reminder - {amount_str} due on {due_date_str}"
         
-        # Create plain text body
-        body_text = f"""
-Dear {customer_name},
-
-This is a friendly reminder that a payment of {amount_str} is due on {due_date_str}.
-
-Please ensure timely payment to avoid any inconvenience.
-
-If you have already made the payment, please disregard this message.
-
-Best regards,
-{self.company_name}
-"""
-        
-        # Create HTML body
-        body_html = f"""
-<html>
-<head></head>
-<body>
-  <p>Dear {customer_name},</p>
-  
-  <p>This is a friendly reminder that a payment of <strong>{amount_str}</strong> is due on <strong>{due_date_str}</strong>.</p>
-  
-  <p>Please ensure timely payment to avoid any inconvenience.</p>
-  
-  <p>If you have already made the payment, please disregard this message.</p>
-  
-  <p>Best regards,<br>
-  {self.company_name}</p>
-</body>
-</html>
-"""
+        # Render the email bodies
+        ctx = {
+            'customer_name': customer_name,
+            'amount_str': amount_str,
+            'due_date_str': due_date_str,
+            'company_name': self.company_name,
+        }
+        body_text = _REMINDER_TEXT_TMPL.format_map(ctx)
+        body_html = _REMINDER_HTML_TMPL.format_map(ctx)
         
-        # Send the email
-        return self.send_email(to_email=None, subject=subject, body_text=body_text, body_html=body_html)
+        return subject, body_text, body_html
     
     def send_payment_confirmation(self, to_email, customer_name, amount_paid, payment_date=None):
         """
@@ -187,34 +870,15 @@ Best regards,
         # Create subject
         subject = f"Payment Confirmation - {amount_str} received"
         
-        # Create plain text body
-        body_text = f"""
-Dear {customer_name},
-
-We have received your payment of {amount_str} on {payment_date_str}.
-
-Thank you for your prompt payment.
-
-Best regards,
-{self.company_name}
-"""
-        
-        # Create HTML body
-        body_html = f"""
-<html>
-<head></head>
-<body>
-  <p>Dear {customer_name},</p>
-  
-  <p>We have received your payment of <strong>{amount_str}</strong> on <strong>{payment_date_str}</strong>.</p>
-  
-  <p>Thank you for your prompt payment.</p>
-  
-  <p>Best regards,<br>
-  {self.company_name}</p>
-</body>
-</html>
-"""
+        # Render the email bodies
+        ctx = {
+            'customer_name': customer_name,
+            'amount_str': amount_str,
+            'payment_date_str': payment_date_str,
+            'company_name': self.company_name,
+        }
+        body_text = _CONFIRMATION_TEXT_TMPL.format_map(ctx)
+        body_html = _CONFIRMATION_HTML_TMPL.format_map(ctx)
         
         # Send the email
         return self.send_email(to_email=to_email, subject=subject, body_text=body_text, body_html=body_html)
@@ -231,6 +895,10 @@ Best regards,
         Returns:
             bool: True if configuration successful
         """
+        # Drop any connection or TLS session from the previous settings
+        self.close()
+        self._tls_session = None
+        
         self.smtp_server = smtp_server
         self.sender_email = sender_email
         self.app_password = app_password
@@ -252,13 +920,10 @@ Best regards,
             return False
             
         try:
-            # Create secure SSL context
-            context = ssl.create_default_context()
-            
             # Test connection
             with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
                 server.ehlo()
-                server.starttls(context=context)
+                server.starttls(context=_SSL_CONTEXT)
                 server.ehlo()
                 server.login(self.sender_email, self.app_password)
             
@@ -283,7 +948,7 @@ if __name__ == "__main__":
         if connection_ok:
             # Test sending an email (replace with a valid test email)
             test_email = input("Enter a test email address: ")
-            if test_email and '@' in test_email:
+            if _clean_email(test_email) is not None:
                 result = email_notifier.send_payment_reminder(
                     to_email=test_email,
                     customer_name="Test Customer",
@@ -3,7 +3,11 @@ Excel Manager Module for Payment Reminder App
 Handles reading from and writing to Excel files, ensuring data integrity
 """
 import pandas as pd
+import openpyxl
 import os
+import threading
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 
@@ -15,6 +19,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger('excel_manager')
 
+# Number of parsed sheets kept in memory by ExcelManager
+_FRAME_CACHE_SIZE = 128
+
+# Formats that openpyxl can edit in place
+_OPENPYXL_SUFFIXES = ('.xlsx', '.xlsm')
+
+# python-calamine (Rust) parses workbooks much faster than openpyxl; pandas
+# supports it as a read engine from 2.2. Fall back to pandas' default engine.
+try:
+    import python_calamine  # noqa: F401
+    _READ_ENGINE = 'calamine' if tuple(int(p) for p in pd.__version__.split('.')[:2]) >= (2, 2) else None
+except ImportError:
+    _READ_ENGINE = None
+
+
+def _parse_date_text(value):
+    """Parse one text due date on its own, giving NaT for anything else"""
+    if isinstance(value, str):
+        try:
+            return pd.to_datetime(value)
+        except (ValueError, OverflowError):
+            pass
+    return pd.NaT
+
 class ExcelManager:
     def __init__(self):
         """Initialize the ExcelManager with expected column definitions"""
@@ -22,21 +50,115 @@ class ExcelManager:
         self.required_columns = ['Name', 'Amount', 'Due Date']
         self.optional_columns = ['Email', 'Status', 'Remarks', 'Payment Date']
         self.all_columns = self.required_columns + self.optional_columns
+        
+        # Parsed sheets keyed by path, tagged with the file's mtime when read
+        self._frame_cache = {}
+        self._cache_lock = threading.Lock()
     
-    def get_payment_entries(self, file_path, city_name=None):
+    def _load_df(self, file_path, columns=None):
         """
-        Read payment entries from an Excel file
+        Read an Excel file into a DataFrame, reusing the last parse if the file is unchanged
         
         Args:
             file_path (str): Path to the Excel file
-            city_name (str, optional): Name of the city, added to each entry if provided
+            columns (list, optional): Only read these columns; the ones missing from the sheet are ignored
             
         Returns:
-            list: List of dictionaries containing payment information
+            DataFrame: A copy of the parsed sheet that the caller may modify
+        """
+        if columns is not None:
+            columns = tuple(columns)
+        key = (file_path, columns)
+        mtime = os.stat(file_path).st_mtime_ns
+        cached = self._frame_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            # Move the entry to the newest end so eviction drops the least recently used
+            with self._cache_lock:
+                if self._frame_cache.pop(key, None) is not None:
+                    self._frame_cache[key] = cached
+            return cached[1].copy()
+        
+        if _READ_ENGINE is None and file_path.lower().endswith(_OPENPYXL_SUFFIXES):
+            df = self._read_workbook(file_path, columns)
+        else:
+            usecols = None if columns is None else columns.__contains__
+            df = pd.read_excel(file_path, engine=_READ_ENGINE, usecols=usecols)
+        
+        # Keep the cache bounded, dropping the least recently used entry first
+        with self._cache_lock:
+            self._frame_cache.pop(key, None)
+            if len(self._frame_cache) >= _FRAME_CACHE_SIZE:
+                self._frame_cache.pop(next(iter(self._frame_cache)))
+            self._frame_cache[key] = (mtime, df)
+        return df.copy()
+    
+    def _read_workbook(self, file_path, columns=None):
+        """
+        Read the first sheet of an .xlsx file through openpyxl's streaming reader
+        
+        A read-only workbook parses rows lazily instead of building the whole
+        cell tree, and its dimensions can't be trusted, so the columns come
+        from the header row.
+        
+        Args:
+            file_path (str): Path to the Excel file
+            columns (tuple, optional): Only read these columns; the ones missing from the sheet are ignored
+            
+        Returns:
+            DataFrame: The sheet, laid out like pd.read_excel would return it
+        """
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+        try:
+            ws = wb.worksheets[0]
+            header = next(ws.iter_rows(max_row=1, values_only=True), ())
+            names = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+            
+            if columns is None:
+                width = len(names)
+                data = [row[:width] + (None,) * (width - len(row))
+                        for row in ws.iter_rows(min_row=2, values_only=True)]
+            else:
+                # Stop each row at the last wanted column so later cells aren't converted
+                indices = [i for i, name in enumerate(names) if name in columns]
+                names = [names[i] for i in indices]
+                data = []
+                if indices:
+                    width = indices[-1] + 1
+                    pick = itemgetter(*indices) if len(indices) > 1 else lambda row: (row[indices[0]],)
+                    append = data.append
+                    for row in ws.iter_rows(min_row=2, max_col=width, values_only=True):
+                        if len(row) < width:
+                            row = row + (None,) * (width - len(row))
+                        append(pick(row))
+        finally:
+            wb.close()
+        
+        # Drop the blank rows openpyxl reports past the last used row
+        while data and all(value is None for value in data[-1]):
+            data.pop()
+        return pd.DataFrame(data, columns=names)
+    
+    def get_payment_frame(self, file_path, city_name=None, include_paid=True, columns=None):
+        """
+        Read payment entries from an Excel file as a DataFrame
+        
+        Args:
+            file_path (str): Path to the Excel file
+            city_name (str, optional): Name of the city, added as a column if provided
+            include_paid (bool, optional): If False, leave out paid rows and rows without a due date
+            columns (list, optional): Only read these columns; the required columns
+                and Status are always read
+            
+        Returns:
+            DataFrame: One row per payment, with 'file_path' and 'row_index' columns
         """
         try:
             # Read Excel file
-            df = pd.read_excel(file_path)
+            optional_columns = self.optional_columns
+            if columns is not None:
+                columns = list(dict.fromkeys(self.required_columns + ['Status'] + list(columns)))
+                optional_columns = [col for col in optional_columns if col in columns]
+            df = self._load_df(file_path, columns)
             
             # Check if required columns exist
             missing_columns = [col for col in self.required_columns if col not in df.columns]
@@ -46,40 +168,93 @@ class ExcelManager:
                 raise ValueError(error_msg)
             
             # Add optional columns if they don't exist
-            for col in self.optional_columns:
-                if col not in df.columns:
-                    df[col] = ""
-            
-            # Convert DataFrame to list of dictionaries
-            entries = df.to_dict('records')
-            
-            # Add file path and city name to each entry
-            for entry in entries:
-                entry['file_path'] = file_path
-                entry['row_index'] = entries.index(entry)  # Add row index for future updates
-                if city_name:
-                    entry['city'] = city_name
-                
-                # Ensure dates are proper datetime objects
-                if isinstance(entry['Due Date'], str):
-                    try:
-                        entry['Due Date'] = pd.to_datetime(entry['Due Date']).date()
-                    except:
-                        logger.warning(f"Could not convert Due Date '{entry['Due Date']}' to datetime")
-                elif hasattr(entry['Due Date'], 'date'):
-                    entry['Due Date'] = entry['Due Date'].date()
-                
-                # Ensure status is set
-                if not entry['Status'] or pd.isna(entry['Status']):
-                    entry['Status'] = 'Unpaid'
-            
-            logger.info(f"Successfully read {len(entries)} entries from {file_path}")
-            return entries
+            missing_optional = [col for col in optional_columns if col not in df.columns]
+            if missing_optional:
+                df = df.reindex(columns=list(df.columns) + missing_optional, fill_value="")
+            
+            # Ensure dates are proper date objects, keeping values that can't be parsed
+            due_dates = pd.to_datetime(df['Due Date'], errors='coerce')
+            unparsed = due_dates.isna() & df['Due Date'].notna()
+            if unparsed.any():
+                # The column parse infers one format from the first value, so text
+                # dates written another way are retried cell by cell
+                reparsed = pd.to_datetime(df['Due Date'][unparsed].map(_parse_date_text))
+                due_dates = due_dates.where(~unparsed, reparsed)
+                unparsed = due_dates.isna() & df['Due Date'].notna()
+            if unparsed.any():
+                logger.warning(f"Could not convert {int(unparsed.sum())} Due Date value(s) to datetime in {file_path}")
+            df['Due Date'] = due_dates.dt.date.where(due_dates.notna(), df['Due Date'])
+            
+            # Ensure status is set
+            status = df['Status']
+            df['Status'] = status.mask(status.isna() | (status == ''), 'Unpaid')
+            
+            # Add file path, row index (for future updates) and city name to each entry
+            df['file_path'] = file_path
+            df['row_index'] = range(len(df))
+            if city_name:
+                df['city'] = city_name
+            
+            # Drop rows that can never be due, keeping the original row indexes
+            if not include_paid:
+                keep = df['Status'].astype(str).str.lower().ne('paid') & df['Due Date'].notna()
+                df = df[keep]
+            
+            return df
             
         except Exception as e:
             logger.error(f"Error reading Excel file {file_path}: {str(e)}")
             raise
     
+    def get_payment_entries(self, file_path, city_name=None, include_paid=True, columns=None):
+        """
+        Read payment entries from an Excel file
+        
+        Args:
+            file_path (str): Path to the Excel file
+            city_name (str, optional): Name of the city, added to each entry if provided
+            include_paid (bool, optional): If False, leave out paid rows and rows without a due date
+            columns (list, optional): Only read these columns; the required columns
+                and Status are always read
+            
+        Returns:
+            list: List of dictionaries containing payment information
+        """
+        # Convert DataFrame to list of dictionaries
+        entries = self.get_payment_frame(file_path, city_name, include_paid, columns).to_dict('records')
+        
+        logger.info(f"Successfully read {len(entries)} entries from {file_path}")
+        return entries
+    
+    def read_many(self, file_paths_and_cities, max_workers=8):
+        """
+        Read payment entries from several Excel files concurrently
+        
+        Parsing is mostly file I/O and C-level decoding, so threads overlap well.
+        Files that fail to read are logged and left out of the result.
+        
+        Args:
+            file_paths_and_cities (list): List of tuples (file_path, city_name)
+            max_workers (int, optional): Maximum number of files read at once
+            
+        Returns:
+            dict: Mapping of file path to its list of payment entries
+        """
+        def read(item):
+            file_path, city_name = item
+            try:
+                return file_path, self.get_payment_entries(file_path, city_name)
+            except Exception:
+                # get_payment_entries already logged the error
+                return file_path, None
+        
+        items = list(file_paths_and_cities)
+        if not items:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return {path: entries for path, entries in executor.map(read, items) if entries is not None}
+    
     def update_payment(self, file_path, row_index, amount_paid=None, status=None, new_date=None, remarks=None):
         """
         Update payment details in an Excel file
@@ -95,58 +270,179 @@ class ExcelManager:
         Returns:
             bool: True if update successful, False otherwise
         """
+        changes = {
+            'amount_paid': amount_paid,
+            'status': status,
+            'new_date': new_date,
+            'remarks': remarks,
+        }
+        return self.bulk_update(file_path, [(row_index, changes)])
+    
+    def bulk_update(self, file_path, updates):
+        """
+        Apply several row updates to one Excel file and save it once
+        
+        Args:
+            file_path (str): Path to the Excel file
+            updates (list): Tuples of (row_index, changes), where changes is a dict of
+                update_payment keyword arguments (amount_paid, status, new_date, remarks)
+            
+        Returns:
+            bool: True if all updates were saved, False otherwise (nothing is saved)
+        """
         try:
-            # Read Excel file
-            df = pd.read_excel(file_path)
+            if file_path.lower().endswith(_OPENPYXL_SUFFIXES):
+                self._update_workbook_rows(file_path, updates)
+            else:
+                self._update_frame_rows(file_path, updates)
             
-            # Ensure row index is valid
-            if row_index < 0 or row_index >= len(df):
-                error_msg = f"Invalid row index: {row_index}, file has {len(df)} rows"
-                logger.error(error_msg)
-                raise IndexError(error_msg)
-            
-            # Update amount and status if specified
-            if amount_paid is not None:
-                total_amount = df.at[row_index, 'Amount']
-                
-                # Check if this is a full or partial payment
-                if amount_paid >= total_amount:
-                    df.at[row_index, 'Status'] = 'Paid'
-                    df.at[row_index, 'Amount'] = 0  # Fully paid, set remaining to 0
-                else:
-                    df.at[row_index, 'Status'] = 'Partial'
-                    df.at[row_index, 'Amount'] = total_amount - amount_paid  # Update remaining amount
-                
-                # Record payment date
-                df.at[row_index, 'Payment Date'] = datetime.now().strftime('%Y-%m-%d')
-            
-            # Override status if explicitly specified
-            if status:
-                df.at[row_index, 'Status'] = status
-            
-            # Update due date if specified
-            if new_date:
-                df.at[row_index, 'Due Date'] = new_date
-            
-            # Update remarks if specified
-            if remarks:
-                # Append to existing remarks if any
-                existing_remarks = df.at[row_index, 'Remarks']
-                if existing_remarks and not pd.isna(existing_remarks):
-                    new_remarks = f"{existing_remarks}; {remarks}"
-                else:
-                    new_remarks = remarks
-                df.at[row_index, 'Remarks'] = new_remarks
-            
-            # Save changes back to Excel file
-            df.to_excel(file_path, index=False)
-            logger.info(f"Successfully updated row {row_index} in {file_path}")
+            # The file changed on disk; don't wait for the mtime check to notice
+            with self._cache_lock:
+                for key in [key for key in self._frame_cache if key[0] == file_path]:
+                    del self._frame_cache[key]
+            
+            rows = ', '.join(str(row_index) for row_index, _ in updates)
+            logger.info(f"Successfully updated row(s) {rows} in {file_path}")
             return True
             
         except Exception as e:
             logger.error(f"Error updating Excel file {file_path}: {str(e)}")
             return False
     
+    def _update_workbook_rows(self, file_path, updates):
+        """Update rows in place with openpyxl, leaving every other cell untouched"""
+        # Keep the macros of .xlsm workbooks when saving, and edit the first
+        # sheet, which is the one every read uses, whichever sheet is active
+        wb = openpyxl.load_workbook(file_path, keep_vba=file_path.lower().endswith('.xlsm'))
+        ws = wb.worksheets[0]
+        
+        # Map header names to column numbers once for all updates
+        columns = {header.value: header.column for header in ws[1] if header.value is not None}
+        
+        for row_index, changes in updates:
+            self._update_sheet_row(ws, columns, row_index, **changes)
+        
+        # Save changes back to Excel file
+        wb.save(file_path)
+    
+    def _update_sheet_row(self, ws, columns, row_index, amount_paid=None, status=None, new_date=None, remarks=None):
+        """Write one row's changes into an openpyxl worksheet"""
+        # Ensure row index is valid (row 1 holds the headers)
+        row_count = ws.max_row - 1
+        if row_index < 0 or row_index >= row_count:
+            error_msg = f"Invalid row index: {row_index}, file has {row_count} rows"
+            logger.error(error_msg)
+            raise IndexError(error_msg)
+        
+        def cell(name):
+            # Add the column to the header row if the sheet doesn't have it yet
+            if name not in columns:
+                columns[name] = ws.max_column + 1
+                ws.cell(row=1, column=columns[name], value=name)
+            return ws.cell(row=row_index + 2, column=columns[name])
+        
+        # Update amount and status if specified
+        if amount_paid is not None:
+            amount_cell = cell('Amount')
+            total_amount = amount_cell.value or 0
+            
+            # Check if this is a full or partial payment
+            if amount_paid >= total_amount:
+                cell('Status').value = 'Paid'
+                amount_cell.value = 0  # Fully paid, set remaining to 0
+            else:
+                cell('Status').value = 'Partial'
+                amount_cell.value = total_amount - amount_paid  # Update remaining amount
+            
+            # Record payment date
+            cell('Payment Date').value = datetime.now().strftime('%Y-%m-%d')
+        
+        # Override status if explicitly specified
+        if status:
+            cell('Status').value = status
+        
+        # Update due date if specified
+        if new_date:
+            cell('Due Date').value = new_date
+        
+        # Update remarks if specified
+        if remarks:
+            # Append to existing remarks if any
+            remarks_cell = cell('Remarks')
+            existing_remarks = remarks_cell.value
+            if existing_remarks:
+                remarks_cell.value = f"{existing_remarks}; {remarks}"
+            else:
+                remarks_cell.value = remarks
+    
+    def _update_frame_rows(self, file_path, updates):
+        """Update rows by rewriting the whole sheet, for formats openpyxl can't edit"""
+        # Read Excel file
+        df = self._load_df(file_path)
+        
+        for row_index, changes in updates:
+            self._update_frame_row(df, row_index, **changes)
+        
+        # Save changes back to Excel file
+        df.to_excel(file_path, index=False)
+    
+    def _update_frame_row(self, df, row_index, amount_paid=None, status=None, new_date=None, remarks=None):
+        """Write one row's changes into a DataFrame"""
+        # Ensure row index is valid
+        if row_index < 0 or row_index >= len(df):
+            error_msg = f"Invalid row index: {row_index}, file has {len(df)} rows"
+            logger.error(error_msg)
+            raise IndexError(error_msg)
+        
+        # Collect the new cell values, then write them in one assignment
+        updates = {}
+        
+        # Update amount and status if specified
+        if amount_paid is not None:
+            total_amount = df.at[row_index, 'Amount']
+            
+            # Check if this is a full or partial payment
+            if amount_paid >= total_amount:
+                updates['Status'] = 'Paid'
+                updates['Amount'] = 0  # Fully paid, set remaining to 0
+            else:
+                updates['Status'] = 'Partial'
+                updates['Amount'] = total_amount - amount_paid  # Update remaining amount
+            
+            # Record payment date
+            updates['Payment Date'] = datetime.now().strftime('%Y-%m-%d')
+        
+        # Override status if explicitly specified
+        if status:
+            updates['Status'] = status
+        
+        # Update due date if specified
+        if new_date:
+            updates['Due Date'] = new_date
+        
+        # Update remarks if specified
+        if remarks:
+            # Append to existing remarks if any
+            existing_remarks = df.at[row_index, 'Remarks'] if 'Remarks' in df.columns else None
+            if existing_remarks and not pd.isna(existing_remarks):
+                updates['Remarks'] = f"{existing_remarks}; {remarks}"
+            else:
+                updates['Remarks'] = remarks
+        
+        if not updates:
+            return
+        
+        # Text and date columns are held as object so pandas doesn't coerce the new values
+        for col in updates:
+            if col == 'Amount':
+                continue
+            if col not in df.columns:
+                df[col] = None
+            elif df[col].dtype != object:
+                df[col] = df[col].astype(object)
+        
+        df.loc[row_index, list(updates)] = list(updates.values())
+    
     def append_log(self, file_path, row_index, log_message):
         """
         Append a log/remark to a specific row
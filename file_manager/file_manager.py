@@ -3,11 +3,18 @@ File Manager Module for Payment Reminder App
 Handles Excel file upload, storage, and organization
 """
 import os
+import re
 import shutil
+import sys
 from datetime import datetime
 import logging
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,11 +23,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger('file_manager')
 
+# File extensions recognised as Excel files (compared in lower case)
+_EXCEL_SUFFIXES = frozenset(('.xlsx', '.xls'))
+
+# Upload timestamp that save_excel_file appends to file names
+_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+_TIMESTAMP_RE = re.compile(r'_(\d{8}_\d{6})\.xlsx?$', re.IGNORECASE)
+
+def _is_excel_file(filename):
+    """Check a file name against the Excel suffixes with one set lookup"""
+    return os.path.splitext(filename)[1].lower() in _EXCEL_SUFFIXES
+
+# ioctl request that makes a copy-on-write clone of a file (Linux, btrfs/xfs);
+# the number is Linux-specific, so other platforms skip the reflink attempt
+if fcntl is not None and sys.platform.startswith('linux'):
+    _FICLONE = getattr(fcntl, 'FICLONE', 0x40049409)
+else:
+    _FICLONE = None
+
 class FileManager:
     def __init__(self, base_folder="payment_data"):
         """Initialize the FileManager with a base folder for data storage"""
         self.base_folder = base_folder
         self._ensure_base_folder_exists()
+        
+        # City folders known to exist, so saves skip the check after the first one
+        self._created_folders = set()
+        
+        # Excel files per city folder, keyed by folder path and tagged with
+        # the folder's mtime, which changes whenever a file is added or removed
+        self._listing_cache = {}
     
     def _ensure_base_folder_exists(self):
         """Create the base folder structure if it doesn't exist"""
@@ -31,11 +63,63 @@ class FileManager:
     def _ensure_city_folder_exists(self, city_name):
         """Create a folder for a specific city if it doesn't exist"""
         city_folder = os.path.join(self.base_folder, city_name)
+        if city_folder in self._created_folders:
+            return city_folder
         if not os.path.exists(city_folder):
             os.makedirs(city_folder)
             logger.info(f"Created city folder: {city_folder}")
+        self._created_folders.add(city_folder)
         return city_folder
     
+    def _fast_copy(self, source_path, target_path):
+        """
+        Copy file contents and metadata using the cheapest method available
+        
+        Tries a copy-on-write reflink, then an in-kernel copy_file_range,
+        then falls back to shutil.copyfile (which itself uses sendfile on Linux).
+        
+        Args:
+            source_path (str): File to copy
+            target_path (str): Destination path
+            
+        Returns:
+            str: Name of the copy method that was used
+        """
+        method = None
+        with open(source_path, 'rb') as fsrc, open(target_path, 'wb') as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            
+            if _FICLONE is not None:
+                try:
+                    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                    method = 'reflink'
+                except OSError:
+                    pass
+            
+            if method is None and hasattr(os, 'copy_file_range'):
+                try:
+                    remaining = os.fstat(src_fd).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                        if copied == 0:
+                            # The source shrank or the filesystem can't do this copy
+                            break
+                        remaining -= copied
+                    if remaining == 0:
+                        method = 'copy_file_range'
+                except OSError:
+                    pass
+                if method is None:
+                    # Discard any partial copy before falling back
+                    fdst.truncate(0)
+        
+        if method is None:
+            shutil.copyfile(source_path, target_path)
+            method = 'copyfile'
+        
+        shutil.copystat(source_path, target_path)
+        return method
+    
     def save_excel_file(self, source_file_path, city_name):
         """
         Save an Excel file to the appropriate city folder
@@ -55,7 +139,7 @@ class FileManager:
         
         # Check file extension
         _, file_extension = os.path.splitext(source_file_path)
-        if file_extension.lower() not in ['.xls', '.xlsx']:
+        if file_extension.lower() not in _EXCEL_SUFFIXES:
             error_msg = f"Invalid file type. Expected Excel file, got {file_extension}"
             logger.error(error_msg)
             raise ValueError(error_msg)
@@ -66,14 +150,18 @@ class FileManager:
         # Generate target filename with timestamp to avoid overwrites
         filename = os.path.basename(source_file_path)
         base_name, ext = os.path.splitext(filename)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime(_TIMESTAMP_FORMAT)
         target_filename = f"{base_name}_{timestamp}{ext}"
         target_path = os.path.join(city_folder, target_filename)
         
         # Copy the file
         try:
-            shutil.copy2(source_file_path, target_path)
-            logger.info(f"File saved successfully: {target_path}")
+            method = self._fast_copy(source_file_path, target_path)
+            
+            # Folder mtimes can be coarse (FAT, network mounts), so don't rely on
+            # them to reveal the new file
+            self._listing_cache.pop(city_folder, None)
+            logger.info(f"File saved successfully ({method}): {target_path}")
             return target_path
         except Exception as e:
             logger.error(f"Error saving file: {str(e)}")
@@ -87,28 +175,93 @@ class FileManager:
             list: List of tuples (file_path, city_name)
         """
         result = []
+        seen = set()
         
         # If base folder doesn't exist, return empty list
-        if not os.path.exists(self.base_folder):
+        try:
+            city_entries = os.scandir(self.base_folder)
+        except FileNotFoundError:
+            self._listing_cache.clear()
             return result
-            
-        # Iterate through all city folders
-        for city_name in os.listdir(self.base_folder):
-            city_path = os.path.join(self.base_folder, city_name)
-            
-            # Skip if not a directory
-            if not os.path.isdir(city_path):
-                continue
+        
+        # Iterate through all city folders; DirEntry reuses the readdir data, so no extra stat calls
+        with city_entries:
+            for city_entry in city_entries:
+                # Skip if not a directory
+                if not city_entry.is_dir():
+                    continue
                 
-            # Find all Excel files in the city folder
-            for filename in os.listdir(city_path):
-                if filename.endswith(('.xlsx', '.xls')):
-                    file_path = os.path.join(city_path, filename)
-                    result.append((file_path, city_name))
+                # Find all Excel files in the city folder
+                seen.add(city_entry.path)
+                result.extend((file_path, city_entry.name) for file_path in self._city_listing(city_entry))
         
+        self._prune_listing_cache(seen)
         logger.info(f"Found {len(result)} Excel files across all city folders")
         return result
     
+    def list_existing_files(self):
+        """
+        List all Excel files in all city folders along with their modification time
+        
+        The mtime comes from the directory scan, so callers can skip their own
+        existence checks and use it as a cache key.
+        
+        Returns:
+            list: List of tuples (file_path, city_name, mtime_ns)
+        """
+        result = []
+        seen = set()
+        
+        # If base folder doesn't exist, return empty list
+        try:
+            city_entries = os.scandir(self.base_folder)
+        except FileNotFoundError:
+            self._listing_cache.clear()
+            return result
+        
+        with city_entries:
+            for city_entry in city_entries:
+                # Skip if not a directory
+                if not city_entry.is_dir():
+                    continue
+                
+                # Editing a file doesn't touch its folder's mtime, so each file is still stat'ed
+                seen.add(city_entry.path)
+                for file_path in self._city_listing(city_entry):
+                    # Files removed since the folder was listed are left out
+                    try:
+                        mtime = os.stat(file_path).st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+                    result.append((file_path, city_entry.name, mtime))
+        
+        self._prune_listing_cache(seen)
+        logger.info(f"Found {len(result)} Excel files across all city folders")
+        return result
+    
+    def _city_listing(self, city_entry):
+        """
+        List the Excel files in a city folder, rescanning it only if it changed
+        
+        Args:
+            city_entry (os.DirEntry): The city folder
+            
+        Returns:
+            list: List of file paths
+        """
+        mtime = city_entry.stat().st_mtime_ns
+        cached = self._listing_cache.get(city_entry.path)
+        if cached is None or cached[0] != mtime:
+            with os.scandir(city_entry.path) as file_entries:
+                files = [file_entry.path for file_entry in file_entries if _is_excel_file(file_entry.name)]
+            cached = self._listing_cache[city_entry.path] = (mtime, files)
+        return cached[1]
+    
+    def _prune_listing_cache(self, seen):
+        """Forget the listings of city folders that weren't in the latest scan"""
+        for city_folder in self._listing_cache.keys() - seen:
+            del self._listing_cache[city_folder]
+    
     def get_city_files(self, city_name):
         """
         Get all Excel files for a specific city
@@ -120,18 +273,13 @@ class FileManager:
             list: List of file paths
         """
         city_folder = os.path.join(self.base_folder, city_name)
-        result = []
         
-        if not os.path.exists(city_folder):
+        try:
+            with os.scandir(city_folder) as entries:
+                return [entry.path for entry in entries if _is_excel_file(entry.name)]
+        except FileNotFoundError:
             logger.warning(f"City folder does not exist: {city_folder}")
-            return result
-            
-        for filename in os.listdir(city_folder):
-            if filename.endswith(('.xlsx', '.xls')):
-                file_path = os.path.join(city_folder, filename)
-                result.append(file_path)
-        
-        return result
+            return []
     
     def get_latest_file_by_city(self, city_name):
         """
@@ -143,14 +291,37 @@ class FileManager:
         Returns:
             str or None: Path to the latest file, or None if no files exist
         """
-        files = self.get_city_files(city_name)
+        city_folder = os.path.join(self.base_folder, city_name)
         
-        if not files:
+        # Uploaded files carry their upload time in the name, and that format sorts
+        # chronologically as a string, so only files without it need a stat call
+        latest_stamped, latest_stamp = None, None
+        latest_other, latest_mtime = None, None
+        try:
+            with os.scandir(city_folder) as entries:
+                for entry in entries:
+                    if not _is_excel_file(entry.name):
+                        continue
+                    match = _TIMESTAMP_RE.search(entry.name)
+                    if match:
+                        if latest_stamp is None or match.group(1) > latest_stamp:
+                            latest_stamped, latest_stamp = entry.path, match.group(1)
+                    else:
+                        mtime = entry.stat().st_mtime
+                        if latest_mtime is None or mtime > latest_mtime:
+                            latest_other, latest_mtime = entry.path, mtime
+        except FileNotFoundError:
+            logger.warning(f"City folder does not exist: {city_folder}")
             return None
-            
-        # Sort by modification time, newest first
-        latest_file = max(files, key=os.path.getmtime)
-        return latest_file
+        
+        if latest_other is None:
+            return latest_stamped
+        if latest_stamped is None:
+            return latest_other
+        
+        # Both kinds present: compare the newest of each on the same clock
+        stamp_time = datetime.strptime(latest_stamp, _TIMESTAMP_FORMAT).timestamp()
+        return latest_stamped if stamp_time >= latest_mtime else latest_other
     
     def list_all_cities(self):
         """
@@ -159,17 +330,11 @@ class FileManager:
         Returns:
             list: List of city names
         """
-        result = []
-        
-        if not os.path.exists(self.base_folder):
-            return result
-            
-        for item in os.listdir(self.base_folder):
-            item_path = os.path.join(self.base_folder, item)
-            if os.path.isdir(item_path):
-                result.append(item)
-                
-        return result
+        try:
+            with os.scandir(self.base_folder) as entries:
+                return [entry.name for entry in entries if entry.is_dir()]
+        except FileNotFoundError:
+            return []
 
 # For testing
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
-import os
 import sys
+import threading
 import tkinter as tk
 from tkinter import messagebox
 
@@ -50,9 +50,6 @@ class PaymentReminderApp:
     def initialize_modules(self):
         """Initialize all application modules"""
         try:
-            # Create data directory if it doesn't exist
-            self.create_data_directory()
-            
             # Initialize file manager
             self.file_manager = FileManager()
             
@@ -82,11 +79,14 @@ class PaymentReminderApp:
                 self.email_notifier
             )
             
+            # List the payment files once for both startup steps
+            files = self.file_manager.list_existing_files()
+            
             # Show startup message
-            self.show_startup_message(email_enabled)
+            self.show_startup_message(email_enabled, files)
             
-            # Check for due payments on startup
-            self.check_due_payments_on_startup()
+            # Check for due payments once the window is up, so parsing doesn't hold it back
+            self.root.after(50, self.check_due_payments_on_startup, files)
             
         except Exception as e:
             messagebox.showerror("Initialization Error", 
@@ -94,11 +94,6 @@ class PaymentReminderApp:
             self.root.destroy()
             sys.exit(1)
             
-    def create_data_directory(self):
-        """Create data directory structure if it doesn't exist"""
-        # Create main data directory
-        os.makedirs("data", exist_ok=True)
-        
     def setup_error_handling(self):
         """Setup global error handling"""
         # Redirect uncaught exceptions to messagebox
@@ -115,14 +110,15 @@ class PaymentReminderApp:
         messagebox.showerror("Application Error", 
                           f"An unexpected error occurred:\n{str(exc_value)}")
                           
-    def show_startup_message(self, email_enabled):
+    def show_startup_message(self, email_enabled, files=None):
         """Show startup welcome message with application status"""
         message = "Payment Reminder Application started successfully!\n\n"
         
         # Get number of files/cities already loaded
         try:
-            files = self.file_manager.list_all_files()
-            cities = set(city for _, city in files)
+            if files is None:
+                files = self.file_manager.list_all_files()
+            cities = set(item[1] for item in files)
             
             message += f"Found {len(files)} payment file(s) for {len(cities)} city/cities.\n"
             
@@ -136,37 +132,46 @@ class PaymentReminderApp:
         except Exception as e:
             print(f"Error displaying startup message: {str(e)}")
             
-    def check_due_payments_on_startup(self):
-        """Check for due payments when application starts"""
-        try:
-            # Get all files
-            files = self.file_manager.list_all_files()
-            
-            if not files:
-                # No files to check
-                return
+    def check_due_payments_on_startup(self, files=None):
+        """Check for due payments when application starts, scanning the files off the UI thread"""
+        def scan():
+            try:
+                # Get all files
+                nonlocal files
+                if files is None:
+                    files = self.file_manager.list_existing_files()
                 
-            # Get due payments
-            due_payments = self.reminder_engine.get_due_payments(files)
+                if not files:
+                    # No files to check
+                    return
+                    
+                # Get due payments, already tagged with their city
+                due_payments = self.reminder_engine.get_due_payments(files)
+            except Exception as e:
+                print(f"Error checking due payments: {str(e)}")
+                return
             
+            # Tk widgets must only be touched from the main loop's thread
             if due_payments:
-                # Add city information to each payment
-                for payment in due_payments:
-                    city = os.path.basename(os.path.dirname(payment['file_path']))
-                    payment['city'] = city
-                
-                # Ask user if they want to see reminders now
-                response = messagebox.askyesno(
-                    "Due Payments Found",
-                    f"Found {len(due_payments)} due or overdue payment(s).\nWould you like to see them now?"
-                )
+                self.root.after(0, self.show_startup_reminders, due_payments)
+        
+        threading.Thread(target=scan, daemon=True).start()
+    
+    def show_startup_reminders(self, due_payments):
+        """Offer to show the due payments found by the startup check"""
+        try:
+            # Ask user if they want to see reminders now
+            response = messagebox.askyesno(
+                "Due Payments Found",
+                f"Found {len(due_payments)} due or overdue payment(s).\nWould you like to see them now?"
+            )
+            
+            if response:
+                # Set pending reminders in UI handler
+                self.ui_handler.pending_reminders = due_payments
                 
-                if response:
-                    # Set pending reminders in UI handler
-                    self.ui_handler.pending_reminders = due_payments
-                    
-                    # Show first reminder
-                    self.ui_handler.show_next_reminder()
+                # Show first reminder
+                self.ui_handler.show_next_reminder()
         except Exception as e:
             print(f"Error checking due payments: {str(e)}")
     
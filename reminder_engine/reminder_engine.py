@@ -4,8 +4,11 @@ Identifies due and overdue payments from Excel files
 """
 import logging
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import os
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -15,6 +18,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger('reminder_engine')
 
+# Columns reminders and summaries use; the rest of each sheet is never read
+_SCAN_COLUMNS = ['Name', 'Amount', 'Due Date', 'Email', 'Status']
+
+# Number of files parsed at once by ReminderEngine.scan
+_SCAN_WORKERS = 8
+
+# Day zero for the day numbers compared in ReminderEngine.scan
+_EPOCH = datetime(1970, 1, 1).date()
+
+# Days overdue beyond 30 are High priority, beyond 7 Medium, anything less Low
+_HIGH_PRIORITY_DAYS = 30
+_MEDIUM_PRIORITY_DAYS = 7
+
 class ReminderEngine:
     def __init__(self, excel_manager):
         """
@@ -24,79 +40,190 @@ class ReminderEngine:
             excel_manager: An instance of ExcelManager class
         """
         self.excel_manager = excel_manager
-        self.today = datetime.now().date()
+        
+        # Parsed frames with their due dates, statuses and amounts keyed by path, tagged
+        # with the file's mtime when read; scan() keeps only the files it was last given
+        self._frame_cache = {}
+        
+        # Last scan() result, tagged with the arguments and file mtimes it was computed from
+        self._scan_cache = None
+        
+        # Excel parsing is mostly zip/XML decoding that releases the GIL,
+        # so files are read on threads
+        self._pool = ThreadPoolExecutor(max_workers=_SCAN_WORKERS)
     
-    def get_due_payments(self, file_paths_and_cities):
+    def _process_file(self, stamp):
         """
-        Check all files and identify due or overdue payments
+        Get the payment frame for a file, re-reading it only when it changed on disk
         
         Args:
-            file_paths_and_cities (list): List of tuples (file_path, city_name)
+            stamp (tuple): (file_path, city_name, mtime_ns), with mtime_ns None if the file is missing
             
         Returns:
-            list: List of dictionaries containing due payment information
+            tuple: (frame, due_days, status, amounts), with the due dates as
+                whole days since the epoch (NaN where missing or invalid), the
+                statuses lowercased as a categorical and the amounts as
+                float64 (NaN where not numeric), or None if the file is missing
+                or couldn't be read. Callers must not modify these in place.
+        """
+        file_path, city_name, mtime = stamp
+        
+        # Skip files that don't exist
+        if mtime is None:
+            logger.warning(f"File does not exist: {file_path}")
+            return None
+        
+        key = (mtime, city_name)
+        cached = self._frame_cache.get(file_path)
+        if cached is None or cached[0] != key:
+            try:
+                frame = self.excel_manager.get_payment_frame(file_path, city_name, columns=_SCAN_COLUMNS)
+                
+                # Parse the due dates once per read rather than on every scan, as
+                # day numbers so a scan only needs a float subtraction
+                due_dates = pd.to_datetime(frame['Due Date'], errors='coerce')
+                due_days = pd.Series(due_dates.values.astype('datetime64[D]').astype('float64'), index=frame.index)
+                due_days[due_dates.isna()] = float('nan')
+                
+                # A sheet only has a handful of distinct statuses, so status
+                # checks become integer code comparisons
+                status = frame['Status'].astype(str).str.lower().astype('category')
+                amounts = pd.to_numeric(frame['Amount'], errors='coerce').astype('float64')
+            except Exception as e:
+                logger.error(f"Error processing file {file_path}: {str(e)}")
+                return None
+            cached = self._frame_cache[file_path] = (key, frame, due_days, status, amounts)
+        return cached[1:]
+    
+    def scan(self, file_paths_and_cities, days_ahead=7):
+        """
+        Check all files once and collect due payments, upcoming payments and a summary
+        
+        Each file is parsed and its dates and statuses are evaluated a single
+        time. The result is memoized until a file changes, the day rolls over
+        or different arguments are passed.
+        
+        Args:
+            file_paths_and_cities (list): List of tuples (file_path, city_name), or
+                (file_path, city_name, mtime_ns) as returned by FileManager.list_existing_files
+            days_ahead (int): Number of days ahead to check for upcoming payments
+            
+        Returns:
+            dict: 'due' and 'upcoming' lists of payment dictionaries and the 'summary' dict
         """
+        # Taken per call so a long-running app rolls over to the new day
+        today = datetime.now().date()
+        
+        # Entries from FileManager.list_existing_files already carry their mtime
+        stamps = []
+        for item in file_paths_and_cities:
+            if len(item) == 3:
+                stamps.append(tuple(item))
+                continue
+            file_path, city_name = item
+            try:
+                stamps.append((file_path, city_name, os.stat(file_path).st_mtime_ns))
+            except OSError:
+                stamps.append((file_path, city_name, None))
+        key = (tuple(stamps), days_ahead, today)
+        if self._scan_cache is not None and self._scan_cache[0] == key:
+            return self._scan_cache[1]
+        
         due_payments = []
+        upcoming_payments = []
+        summary = {
+            'total_payments': 0,
+            'paid_payments': 0,
+            'partial_payments': 0,
+            'unpaid_payments': 0,
+            'overdue_payments': 0,
+            'due_today': 0,
+            'upcoming_payments': 0,
+            'total_amount_due': 0
+        }
+        today_days = float((today - _EPOCH).days)
         
-        for file_path, city_name in file_paths_and_cities:
-            # Skip files that don't exist
-            if not os.path.exists(file_path):
-                logger.warning(f"File does not exist: {file_path}")
+        frames = self._pool.map(self._process_file, stamps) if len(stamps) > 1 else map(self._process_file, stamps)
+        for (file_path, _, _), loaded in zip(stamps, frames):
+            if loaded is None:
                 continue
                 
             try:
-                # Get all payment entries from this file
-                entries = self.excel_manager.get_payment_entries(file_path, city_name)
+                frame, due_days, status, amounts = loaded
                 
-                # Filter for due or overdue payments
-                for entry in entries:
-                    # Skip if payment is already fully paid
-                    if entry.get('Status', '').lower() == 'paid':
-                        continue
-                    
-                    # Get due date
-                    due_date = entry.get('Due Date')
-                    
-                    # Skip if due date is missing or invalid
-                    if not due_date:
-                        continue
-                    
-                    # Convert string dates if needed
-                    if isinstance(due_date, str):
-                        try:
-                            due_date = pd.to_datetime(due_date).date()
-                        except Exception as e:
-                            logger.warning(f"Failed to parse due date '{due_date}': {str(e)}")
-                            continue
-                    
-                    # Convert Timestamp to date if needed
-                    if hasattr(due_date, 'date'):
-                        due_date = due_date.date()
+                # Days from today until each due date; missing or invalid
+                # due dates stay NaN and match none of the checks below
+                delta = due_days - today_days
+                not_paid = status != 'paid'
+                
+                # Due or overdue payments that aren't fully paid
+                mask = not_paid & (delta <= 0)
+                if mask.any():
+                    due = frame[mask].copy()
+                    due['days_overdue'] = (-delta[mask]).astype(int)
                     
-                    # Check if payment is due or overdue
-                    if due_date <= self.today:
-                        # Calculate days overdue
-                        days_overdue = (self.today - due_date).days
-                        entry['days_overdue'] = days_overdue
-                        
-                        # Add priority based on days overdue
-                        if days_overdue > 30:
-                            entry['priority'] = 'High'
-                        elif days_overdue > 7:
-                            entry['priority'] = 'Medium'
-                        else:
-                            entry['priority'] = 'Low'
-                        
-                        due_payments.append(entry)
+                    # Add priority based on days overdue
+                    days_overdue = due['days_overdue'].to_numpy()
+                    due['priority'] = np.select(
+                        [days_overdue > _HIGH_PRIORITY_DAYS, days_overdue > _MEDIUM_PRIORITY_DAYS],
+                        ['High', 'Medium'], default='Low').astype(object)
+                    due_payments.extend(due.to_dict('records'))
+                
+                # Payments not due yet, but due within days_ahead
+                mask = not_paid & (delta > 0) & (delta <= days_ahead)
+                if mask.any():
+                    upcoming = frame[mask].copy()
+                    upcoming['days_until_due'] = delta[mask].astype(int)
+                    upcoming_payments.extend(upcoming.to_dict('records'))
+                
+                # Summary counters; anything not paid or partial counts as unpaid
+                counts = status.value_counts()
+                paid = int(counts.get('paid', 0))
+                partial = int(counts.get('partial', 0))
+                summary['total_payments'] += len(frame)
+                summary['paid_payments'] += paid
+                summary['partial_payments'] += partial
+                summary['unpaid_payments'] += len(frame) - paid - partial
+                summary['total_amount_due'] += float(amounts[not_paid].sum())
+                summary['overdue_payments'] += int((not_paid & (delta < 0)).sum())
+                summary['due_today'] += int((not_paid & (delta == 0)).sum())
+                summary['upcoming_payments'] += int((not_paid & (delta > 0)).sum())
             
             except Exception as e:
                 logger.error(f"Error processing file {file_path}: {str(e)}")
         
+        # Forget files that are no longer listed, such as replaced uploads
+        scanned = {file_path for file_path, _, _ in stamps}
+        for file_path in self._frame_cache.keys() - scanned:
+            del self._frame_cache[file_path]
+        
         # Sort due payments by priority (days overdue)
-        due_payments.sort(key=lambda x: x.get('days_overdue', 0), reverse=True)
+        due_payments.sort(key=itemgetter('days_overdue'), reverse=True)
+        
+        # Sort upcoming payments by due date (ascending); days_until_due comes from
+        # the parsed day numbers, so raw cell values never get compared
+        upcoming_payments.sort(key=itemgetter('days_until_due'))
+        
+        logger.info(f"Found {len(due_payments)} due/overdue payments and "
+                    f"{len(upcoming_payments)} upcoming payments within {days_ahead} days across all files")
         
-        logger.info(f"Found {len(due_payments)} due/overdue payments across all files")
-        return due_payments
+        result = {'due': due_payments, 'upcoming': upcoming_payments, 'summary': summary}
+        self._scan_cache = (key, result)
+        return result
+    
+    def get_due_payments(self, file_paths_and_cities, top_k=None):
+        """
+        Check all files and identify due or overdue payments
+        
+        Args:
+            file_paths_and_cities (list): List of tuples (file_path, city_name)
+            top_k (int, optional): Only return the top_k most overdue payments
+            
+        Returns:
+            list: List of dictionaries containing due payment information
+        """
+        # scan() keeps the list sorted, so the most overdue are already first
+        return [dict(entry) for entry in self.scan(file_paths_and_cities)['due'][:top_k]]
     
     def get_upcoming_payments(self, file_paths_and_cities, days_ahead=7):
         """
@@ -109,57 +236,7 @@ class ReminderEngine:
         Returns:
             list: List of dictionaries containing upcoming payment information
         """
-        upcoming_payments = []
-        future_date = self.today + timedelta(days=days_ahead)
-        
-        for file_path, city_name in file_paths_and_cities:
-            # Skip files that don't exist
-            if not os.path.exists(file_path):
-                continue
-                
-            try:
-                # Get all payment entries from this file
-                entries = self.excel_manager.get_payment_entries(file_path, city_name)
-                
-                # Filter for upcoming payments
-                for entry in entries:
-                    # Skip if payment is already fully paid
-                    if entry.get('Status', '').lower() == 'paid':
-                        continue
-                    
-                    # Get due date
-                    due_date = entry.get('Due Date')
-                    
-                    # Skip if due date is missing or invalid
-                    if not due_date:
-                        continue
-                    
-                    # Convert string dates if needed
-                    if isinstance(due_date, str):
-                        try:
-                            due_date = pd.to_datetime(due_date).date()
-                        except:
-                            continue
-                    
-                    # Convert Timestamp to date if needed
-                    if hasattr(due_date, 'date'):
-                        due_date = due_date.date()
-                    
-                    # Check if payment is upcoming (not due yet, but will be soon)
-                    if self.today < due_date <= future_date:
-                        # Calculate days until due
-                        days_until_due = (due_date - self.today).days
-                        entry['days_until_due'] = days_until_due
-                        upcoming_payments.append(entry)
-            
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {str(e)}")
-        
-        # Sort upcoming payments by due date (ascending)
-        upcoming_payments.sort(key=lambda x: x.get('Due Date'))
-        
-        logger.info(f"Found {len(upcoming_payments)} upcoming payments within {days_ahead} days")
-        return upcoming_payments
+        return [dict(entry) for entry in self.scan(file_paths_and_cities, days_ahead)['upcoming']]
     
     def get_payment_summary(self, file_paths_and_cities):
         """
@@ -171,65 +248,7 @@ class ReminderEngine:
         Returns:
             dict: Summary statistics
         """
-        summary = {
-            'total_payments': 0,
-            'paid_payments': 0,
-            'partial_payments': 0,
-            'unpaid_payments': 0,
-            'overdue_payments': 0,
-            'due_today': 0,
-            'upcoming_payments': 0,
-            'total_amount_due': 0
-        }
-        
-        for file_path, city_name in file_paths_and_cities:
-            if not os.path.exists(file_path):
-                continue
-                
-            try:
-                entries = self.excel_manager.get_payment_entries(file_path, city_name)
-                
-                for entry in entries:
-                    summary['total_payments'] += 1
-                    
-                    status = entry.get('Status', '').lower()
-                    if status == 'paid':
-                        summary['paid_payments'] += 1
-                    elif status == 'partial':
-                        summary['partial_payments'] += 1
-                        summary['total_amount_due'] += float(entry.get('Amount', 0))
-                    else:  # Unpaid
-                        summary['unpaid_payments'] += 1
-                        summary['total_amount_due'] += float(entry.get('Amount', 0))
-                    
-                    due_date = entry.get('Due Date')
-                    
-                    # Skip if due date is missing or invalid
-                    if not due_date:
-                        continue
-                    
-                    # Convert to date object if needed
-                    if isinstance(due_date, str):
-                        try:
-                            due_date = pd.to_datetime(due_date).date()
-                        except:
-                            continue
-                    
-                    if hasattr(due_date, 'date'):
-                        due_date = due_date.date()
-                    
-                    # Check date status
-                    if due_date < self.today and status != 'paid':
-                        summary['overdue_payments'] += 1
-                    elif due_date == self.today and status != 'paid':
-                        summary['due_today'] += 1
-                    elif due_date > self.today and status != 'paid':
-                        summary['upcoming_payments'] += 1
-            
-            except Exception as e:
-                logger.error(f"Error generating summary for file {file_path}: {str(e)}")
-        
-        return summary
+        return dict(self.scan(file_paths_and_cities)['summary'])
 
 # For testing
 if __name__ == "__main__":
@@ -2,6 +2,10 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 import datetime
+import logging
+import queue
+import threading
+import time
 try:
     from tkcalendar import DateEntry
 except ImportError:
@@ -19,6 +23,29 @@ except ImportError:
                 return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
             except:
                 return datetime.date.today()
+        
+        def set_date(self, date):
+            self.delete(0, tk.END)
+            self.insert(0, date.strftime("%Y-%m-%d"))
+
+
+logger = logging.getLogger('ui_handler')
+
+# Quiet period after the last keystroke before the search is applied
+_SEARCH_DEBOUNCE_MS = 250
+
+# Seconds a file listing is reused before the folders are scanned again
+_FILES_CACHE_TTL = 5.0
+
+# Treeview tags for paid and overdue rows
+_PAID_TAGS = ("paid",)
+_OVERDUE_TAGS = ("overdue",)
+
+# How often the Tk thread checks for files parsed in the background
+_QUEUE_POLL_MS = 50
+
+# Rows added to the payment list at a time; more are added as the user scrolls near the end
+_LIST_CHUNK_SIZE = 200
 
 
 class UIHandler:
@@ -33,6 +60,35 @@ class UIHandler:
         self.pending_reminders = []
         self.reminder_windows = []
         
+        # Reminder popup built on first use and reused for every later reminder
+        self._reminder_window = None
+        self._reminder_vars = {}
+        self._date_picker = None
+        self._current_reminder = None
+        
+        # Pending after() id for the debounced search refresh
+        self._search_after_id = None
+        
+        # Parsed entries keyed by path, tagged with the file's mtime when read
+        self._entries_cache = {}
+        
+        # Last file listing and when it was taken; cleared whenever the app writes a file
+        self._files_cache = None
+        self._files_cache_time = 0.0
+        
+        # Files parsed by the background loader, waiting to be picked up on the Tk thread
+        self._parse_queue = queue.SimpleQueue()
+        self._loading = False
+        
+        # Entries matching the current filters, and how many of them are in the tree
+        self._filtered_entries = []
+        self._rendered_count = 0
+        
+        # Entry shown in each treeview row, keyed by the row's iid, and the
+        # reverse map keyed by id(entry) for updating a single row
+        self._iid_to_entry = {}
+        self._entry_to_iid = {}
+        
         # Set window title and size
         self.root.title("Payment Reminder App")
         self.root.geometry("900x600")
@@ -94,7 +150,7 @@ class UIHandler:
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(self.filter_frame, textvariable=self.search_var, width=25)
         self.search_entry.grid(row=0, column=1, padx=5, pady=5)
-        self.search_entry.bind("<KeyRelease>", self.apply_filters)
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
         
         # City filter
         ttk.Label(self.filter_frame, text="City:").grid(row=0, column=2, padx=5, pady=5)
@@ -132,7 +188,7 @@ class UIHandler:
         # Define columns for the treeview
         columns = ("name", "amount", "due_date", "status", "city", "email")
         self.payment_tree = ttk.Treeview(self.tree_frame, columns=columns, show="headings", 
-                                        yscrollcommand=self.tree_scroll.set)
+                                        yscrollcommand=self._on_tree_scroll)
         
         # Configure the scrollbar
         self.tree_scroll.config(command=self.payment_tree.yview)
@@ -153,6 +209,10 @@ class UIHandler:
         self.payment_tree.column("city", width=100)
         self.payment_tree.column("email", width=200)
         
+        # Row styles, configured once and shared by every row that uses them
+        self.payment_tree.tag_configure("paid", foreground="gray")
+        self.payment_tree.tag_configure("overdue", foreground="red")
+        
         self.payment_tree.pack(fill=tk.BOTH, expand=True)
         
         # Bind double-click event to open payment details
@@ -190,6 +250,7 @@ class UIHandler:
             
         try:
             saved_path = self.file_manager.save_excel_file(file_path, city)
+            self._files_cache = None
             self.status_var.set(f"File for {city} uploaded successfully!")
             self.file_path_var.set("")
             self.city_var.set("")
@@ -206,16 +267,39 @@ class UIHandler:
     def update_city_filter_combo(self):
         """Update the city filter combobox with all available cities"""
         try:
-            cities = [os.path.basename(os.path.dirname(file)) for file in self.file_manager.list_all_files()]
-            cities = list(set(cities))  # Remove duplicates
+            # Remove duplicates in one pass, keeping the folder order
+            cities = list(dict.fromkeys(city for _, city, _ in self._all_files()))
             cities.insert(0, "All")
             self.city_filter_combo['values'] = cities
             self.city_filter_combo.current(0)
-        except Exception as e:
-            print(f"Error updating city filter: {str(e)}")
+        except OSError:
+            logger.exception("Error updating city filter")
             
+    def _on_search_key(self, event=None):
+        """Refresh the list once typing pauses instead of on every keystroke"""
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(_SEARCH_DEBOUNCE_MS, self.apply_filters)
+        
+    def _all_files(self):
+        """
+        List all payment files, reusing a recent listing
+        
+        Returns:
+            list: List of tuples (file_path, city_name, mtime_ns)
+        """
+        now = time.monotonic()
+        if self._files_cache is None or now - self._files_cache_time > _FILES_CACHE_TTL:
+            self._files_cache = self.file_manager.list_existing_files()
+            self._files_cache_time = now
+        return self._files_cache
+        
     def apply_filters(self, event=None):
         """Apply search and filters to the payment list"""
+        # A filter change supersedes any search refresh still waiting to run
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
         self.update_list_view()
         
     def reset_filters(self):
@@ -227,42 +311,52 @@ class UIHandler:
         
     def update_list_view(self):
         """Update the payment list based on the current filters"""
-        # Clear current list
-        for item in self.payment_tree.get_children():
-            self.payment_tree.delete(item)
+        # A load is in flight; it calls back here once every file has arrived
+        if self._loading:
+            return
             
         try:
             # Get all files
-            file_paths = self.file_manager.list_all_files()
+            file_paths = self._all_files()
             
-            all_entries = []
+            # Parse new or changed files on a worker thread so the window stays responsive
+            stale = []
+            for file_path, city, mtime in file_paths:
+                cached = self._entries_cache.get(file_path)
+                if cached is None or cached[0] != mtime:
+                    stale.append((file_path, city, mtime))
+            if stale:
+                self._loading = True
+                self.status_var.set("Loading payment files...")
+                threading.Thread(target=self._load_files_worker, args=(stale,), daemon=True).start()
+                self.root.after(_QUEUE_POLL_MS, self._drain_parse_queue)
+                return
             
-            # Get entries from each file
-            for file_path in file_paths:
-                city = os.path.basename(os.path.dirname(file_path))
-                entries = self.excel_manager.get_payment_entries(file_path)
-                
-                # Add city information to each entry
-                for entry in entries:
-                    entry['city'] = city
-                    entry['file_path'] = file_path
-                    entry['row_index'] = entries.index(entry)
-                    
-                all_entries.extend(entries)
-                
-            # Apply filters
-            filtered_entries = self.filter_entries(all_entries)
-            
-            # Add filtered entries to treeview
-            for entry in filtered_entries:
-                self.payment_tree.insert("", tk.END, values=(
-                    entry.get('Name', ''),
-                    entry.get('Amount', ''),
-                    entry.get('Due Date', ''),
-                    entry.get('Status', 'Unpaid'),
-                    entry.get('city', ''),
-                    entry.get('Email', '')
-                ))
+            # Clear current list in a single Tcl call
+            children = self.payment_tree.get_children()
+            if children:
+                self.payment_tree.delete(*children)
+            
+            # Group the cached lists by city without copying them into one big list
+            entries_by_city = {}
+            for file_path, city, _ in file_paths:
+                entries_by_city.setdefault(city, []).append(self._entries_cache[file_path][1])
+            
+            # Apply filters while streaming the entries, starting from just the selected
+            # city's, which makes a per-entry city check unnecessary
+            city_filter = self.city_filter_var.get()
+            if city_filter == "All":
+                groups = entries_by_city.values()
+            else:
+                groups = [entries_by_city.get(city_filter, [])]
+            filtered_entries = self.filter_entries(self._iter_entries(groups), check_city=False)
+            
+            # Add the first chunk of filtered entries to treeview; the rest follow on scroll
+            self._filtered_entries = filtered_entries
+            self._iid_to_entry = {}
+            self._entry_to_iid = {}
+            self._rendered_count = 0
+            self._render_more_rows()
                 
             # Update status with count
             self.status_var.set(f"Showing {len(filtered_entries)} payment entries")
@@ -270,17 +364,187 @@ class UIHandler:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update list: {str(e)}")
             
-    def filter_entries(self, entries):
-        """Filter entries based on current filter settings"""
+    def _iter_entries(self, groups):
+        """Yield every entry from groups of per-file entry lists"""
+        for group in groups:
+            for entries in group:
+                yield from entries
+                
+    def _load_files_worker(self, files):
+        """Parse payment files off the Tk thread, handing each result over through the queue"""
+        for file_path, city, mtime in files:
+            try:
+                # ExcelManager tags each entry with the city, file path and row index
+                entries = self.excel_manager.get_payment_entries(file_path, city)
+                
+                # Lowercase the searchable values once per read rather than on every filter
+                for entry in entries:
+                    self._set_search_blob(entry)
+                
+                self._parse_queue.put((file_path, mtime, entries, None))
+            except Exception as e:
+                # Cache the failure as empty so the error is shown once, not on every refresh
+                self._parse_queue.put((file_path, mtime, [], e))
+        
+        # Tell the Tk thread the batch is complete
+        self._parse_queue.put(None)
+        
+    def _set_search_blob(self, entry):
+        """Store the lowercased searchable text of an entry for filter_entries"""
+        entry['_search_blob'] = '\0'.join(
+            str(value).lower() for key, value in entry.items()
+            if key != '_search_blob' and isinstance(value, (str, int, float)))
+        
+    def _drain_parse_queue(self):
+        """Move parsed files into the cache, refreshing the list once the whole batch is in"""
+        while True:
+            try:
+                item = self._parse_queue.get_nowait()
+            except queue.Empty:
+                break
+                
+            if item is None:
+                self._loading = False
+                self.update_list_view()
+                return
+                
+            file_path, mtime, entries, error = item
+            self._entries_cache[file_path] = (mtime, entries)
+            if error is not None:
+                messagebox.showerror("Error", f"Failed to update list: {str(error)}")
+                
+        self.root.after(_QUEUE_POLL_MS, self._drain_parse_queue)
+        
+    def _render_more_rows(self):
+        """Insert the next chunk of filtered entries into the treeview"""
+        start = self._rendered_count
+        chunk = self._filtered_entries[start:start + _LIST_CHUNK_SIZE]
+        rows = [self._row_values(entry) for entry in chunk]
+        
+        today = datetime.date.today()
+        tags = [self._row_tags(entry, today) for entry in chunk]
+        
+        # Explicit iids spare Tk generating them and map rows straight back to their entries
+        insert = self.payment_tree.insert
+        for i, (entry, values, row_tags) in enumerate(zip(chunk, rows, tags), start):
+            iid = str(i)
+            insert("", tk.END, iid=iid, values=values, tags=row_tags)
+            self._iid_to_entry[iid] = entry
+            self._entry_to_iid[id(entry)] = iid
+        self._rendered_count = start + len(rows)
+        
+    def _row_values(self, entry):
+        """Get the values shown for an entry, in the treeview's column order"""
+        return (
+            entry.get('Name', ''),
+            entry.get('Amount', ''),
+            entry.get('Due Date', ''),
+            entry.get('Status', 'Unpaid'),
+            entry.get('city', ''),
+            entry.get('Email', '')
+        )
+        
+    def _row_tags(self, entry, today):
+        """Get the treeview tags for an entry"""
+        # Grey out paid rows and highlight unpaid ones past their due date; ExcelManager
+        # hands parsed due dates over as plain dates (a missing one is NaT, a datetime subclass)
+        due_date = entry.get('Due Date')
+        if entry.get('Status') == "Paid":
+            return _PAID_TAGS
+        if type(due_date) is datetime.date and due_date < today:
+            return _OVERDUE_TAGS
+        return ()
+        
+    def _patch_list_entry(self, entry, amount_paid=None, status=None, new_date=None, remarks=None):
+        """
+        Apply a saved payment update to the cached entry and its treeview row
+        
+        Mirrors the cell changes ExcelManager.update_payment writes, so a single
+        update doesn't cost a re-read of the file and a rebuild of the list.
+        Falls back to update_list_view when the entry isn't cached or the update
+        moves it into or out of the current filters.
+        """
+        file_path = entry['file_path']
+        row_index = entry['row_index']
+        cached = self._entries_cache.get(file_path)
+        try:
+            if cached is None or row_index >= len(cached[1]):
+                raise LookupError(row_index)
+            cached_entry = cached[1][row_index]
+            was_listed = bool(self.filter_entries([cached_entry]))
+            
+            if amount_paid is not None:
+                total_amount = cached_entry.get('Amount') or 0
+                if amount_paid >= total_amount:
+                    cached_entry['Status'] = 'Paid'
+                    cached_entry['Amount'] = 0
+                else:
+                    cached_entry['Status'] = 'Partial'
+                    cached_entry['Amount'] = total_amount - amount_paid
+                cached_entry['Payment Date'] = datetime.date.today().strftime('%Y-%m-%d')
+            if status:
+                cached_entry['Status'] = status
+            if new_date:
+                cached_entry['Due Date'] = new_date
+            if remarks:
+                existing_remarks = cached_entry.get('Remarks')
+                if isinstance(existing_remarks, str) and existing_remarks:
+                    cached_entry['Remarks'] = f"{existing_remarks}; {remarks}"
+                else:
+                    cached_entry['Remarks'] = remarks
+            self._set_search_blob(cached_entry)
+            
+            # The cache now matches the saved file, so the next refresh needn't re-read it
+            self._entries_cache[file_path] = (os.stat(file_path).st_mtime_ns, cached[1])
+        except Exception:
+            self._entries_cache.pop(file_path, None)
+            self.update_list_view()
+            return
+            
+        # An entry entering or leaving the filtered list changes the rows and count
+        if bool(self.filter_entries([cached_entry])) != was_listed:
+            self.update_list_view()
+            return
+            
+        # Rows not rendered yet pick the new values up from the entry when they are
+        iid = self._entry_to_iid.get(id(cached_entry))
+        if iid is not None:
+            self.payment_tree.item(iid, values=self._row_values(cached_entry),
+                                   tags=self._row_tags(cached_entry, datetime.date.today()))
+        
+    def _on_tree_scroll(self, first, last):
+        """Keep the scrollbar in sync and load more rows when the view nears the end"""
+        self.tree_scroll.set(first, last)
+        if float(last) > 0.9 and self._rendered_count < len(self._filtered_entries):
+            self._render_more_rows()
+        
+    def filter_entries(self, entries, check_city=True):
+        """
+        Filter entries based on current filter settings
+        
+        Args:
+            entries (iterable): Payment entries to filter
+            check_city (bool): False if the entries are already limited to the selected city
+            
+        Returns:
+            list: The entries that match the filters
+        """
         filtered = []
+        append = filtered.append
         
+        # Each StringVar.get() is a Tcl round-trip, so read the filters once
+        # here and never inside the row loop
         search_term = self.search_var.get().lower()
-        city_filter = self.city_filter_var.get()
+        city_filter = self.city_filter_var.get() if check_city else "All"
         status_filter = self.status_filter_var.get()
         
+        # "Paid" keeps paid entries and "Unpaid" keeps the rest, so both are one equality test
+        check_status = status_filter in ("Paid", "Unpaid")
+        want_paid = status_filter == "Paid"
+        
         for entry in entries:
             # Apply search term filter
-            if search_term and not any(search_term in str(value).lower() for value in entry.values() if isinstance(value, (str, int, float))):
+            if search_term and search_term not in entry['_search_blob']:
                 continue
                 
             # Apply city filter
@@ -288,30 +552,24 @@ class UIHandler:
                 continue
                 
             # Apply status filter
-            if status_filter != "All":
-                if status_filter == "Paid" and entry.get('Status', '') != "Paid":
-                    continue
-                if status_filter == "Unpaid" and entry.get('Status', '') == "Paid":
-                    continue
+            if check_status and (entry.get('Status', '') == "Paid") != want_paid:
+                continue
                     
-            filtered.append(entry)
+            append(entry)
             
         return filtered
         
     def check_due_payments(self):
         """Manually check for due payments and show reminders"""
-        file_paths = self.file_manager.list_all_files()
+        file_paths = self._all_files()
+        
+        # Due payments carry their city from the (file_path, city_name) pairs
         due_payments = self.reminder_engine.get_due_payments(file_paths)
         
         if not due_payments:
             messagebox.showinfo("Reminders", "No due or overdue payments found.")
             return
             
-        # Add city information
-        for payment in due_payments:
-            city = os.path.basename(os.path.dirname(payment['file_path']))
-            payment['city'] = city
-            
         # Store pending reminders
         self.pending_reminders = due_payments
         
@@ -329,6 +587,32 @@ class UIHandler:
         
     def show_due_reminder(self, entry):
         """Display a non-dismissible popup for due payment"""
+        # Build the window on first use, then only refill it for each reminder
+        if self._reminder_window is None or not self._reminder_window.winfo_exists():
+            self._build_reminder_window()
+        reminder_window = self._reminder_window
+        
+        # Store the window and related info
+        self._current_reminder = entry
+        self.reminder_windows.append({
+            'window': reminder_window,
+            'entry': entry
+        })
+        
+        # Fill in the payment information and reset the inputs
+        self._reminder_vars['name'].set(entry.get('Name', 'N/A'))
+        self._reminder_vars['amount'].set(str(entry.get('Amount', 'N/A')))
+        self._reminder_vars['due_date'].set(str(entry.get('Due Date', 'N/A')))
+        self._reminder_vars['city'].set(entry.get('city', 'N/A'))
+        self._reminder_vars['paid_amount'].set(str(entry.get('Amount', '0')))
+        self._reminder_vars['remark'].set("")
+        self._date_picker.set_date(datetime.date.today())
+        
+        reminder_window.deiconify()
+        reminder_window.lift()
+        
+    def _build_reminder_window(self):
+        """Create the reminder popup once; show_due_reminder fills it in for each payment"""
         # Create a new top-level window
         reminder_window = tk.Toplevel(self.root)
         reminder_window.title("Payment Reminder")
@@ -338,11 +622,9 @@ class UIHandler:
         # Prevent window from being closed with the X button
         reminder_window.protocol("WM_DELETE_WINDOW", lambda: None)
         
-        # Store the window and related info
-        self.reminder_windows.append({
-            'window': reminder_window,
-            'entry': entry
-        })
+        self._reminder_window = reminder_window
+        self._reminder_vars = {name: tk.StringVar() for name in
+                               ('name', 'amount', 'due_date', 'city', 'paid_amount', 'remark')}
         
         # Payment info frame
         info_frame = ttk.Frame(reminder_window, padding=10)
@@ -358,19 +640,19 @@ class UIHandler:
         
         # Row 1: Name
         ttk.Label(info_grid, text="Name:", width=12).grid(row=0, column=0, sticky=tk.W, pady=2)
-        ttk.Label(info_grid, text=entry.get('Name', 'N/A'), font=("Arial", 10, "bold")).grid(row=0, column=1, sticky=tk.W, pady=2)
+        ttk.Label(info_grid, textvariable=self._reminder_vars['name'], font=("Arial", 10, "bold")).grid(row=0, column=1, sticky=tk.W, pady=2)
         
         # Row 2: Amount
         ttk.Label(info_grid, text="Amount Due:", width=12).grid(row=1, column=0, sticky=tk.W, pady=2)
-        ttk.Label(info_grid, text=str(entry.get('Amount', 'N/A')), font=("Arial", 10, "bold")).grid(row=1, column=1, sticky=tk.W, pady=2)
+        ttk.Label(info_grid, textvariable=self._reminder_vars['amount'], font=("Arial", 10, "bold")).grid(row=1, column=1, sticky=tk.W, pady=2)
         
         # Row 3: Due Date
         ttk.Label(info_grid, text="Due Date:", width=12).grid(row=2, column=0, sticky=tk.W, pady=2)
-        ttk.Label(info_grid, text=str(entry.get('Due Date', 'N/A')), font=("Arial", 10, "bold")).grid(row=2, column=1, sticky=tk.W, pady=2)
+        ttk.Label(info_grid, textvariable=self._reminder_vars['due_date'], font=("Arial", 10, "bold")).grid(row=2, column=1, sticky=tk.W, pady=2)
         
         # Row 4: City
         ttk.Label(info_grid, text="City:", width=12).grid(row=3, column=0, sticky=tk.W, pady=2)
-        ttk.Label(info_grid, text=entry.get('city', 'N/A')).grid(row=3, column=1, sticky=tk.W, pady=2)
+        ttk.Label(info_grid, textvariable=self._reminder_vars['city']).grid(row=3, column=1, sticky=tk.W, pady=2)
         
         ttk.Separator(reminder_window).pack(fill=tk.X, padx=10)
         
@@ -387,13 +669,16 @@ class UIHandler:
         payment_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(payment_frame, text="Amount Paid:").grid(row=0, column=0, padx=5)
-        paid_amount_var = tk.StringVar()
-        paid_amount_var.set(str(entry.get('Amount', '0')))
-        paid_amount_entry = ttk.Entry(payment_frame, textvariable=paid_amount_var, width=10)
+        paid_amount_entry = ttk.Entry(payment_frame, textvariable=self._reminder_vars['paid_amount'], width=10)
         paid_amount_entry.grid(row=0, column=1, padx=5)
         
+        # The buttons act on whichever payment the window is currently showing
         mark_paid_button = ttk.Button(options_frame, text="Mark as Paid",
-                                    command=lambda: self.mark_as_paid(entry, paid_amount_var.get(), reminder_window))
+                                    command=lambda: self.mark_as_paid(
+                                        self._current_reminder,
+                                        self._reminder_vars['paid_amount'].get(),
+                                        reminder_window
+                                    ))
         mark_paid_button.pack(fill=tk.X, pady=5)
         
         ttk.Separator(reminder_window).pack(fill=tk.X, padx=10, pady=5)
@@ -412,22 +697,20 @@ class UIHandler:
         ttk.Label(date_frame, text="New Due Date:").grid(row=0, column=0, padx=5)
         
         # Use DateEntry for date selection
-        new_date_var = tk.StringVar()
-        date_picker = DateEntry(date_frame, width=12, background='darkblue',
-                              foreground='white', borderwidth=2)
-        date_picker.grid(row=0, column=1, padx=5)
+        self._date_picker = DateEntry(date_frame, width=12, background='darkblue',
+                                    foreground='white', borderwidth=2)
+        self._date_picker.grid(row=0, column=1, padx=5)
         
         # Remark entry
         ttk.Label(date_frame, text="Remark:").grid(row=1, column=0, padx=5, pady=5)
-        remark_var = tk.StringVar()
-        remark_entry = ttk.Entry(date_frame, textvariable=remark_var, width=25)
+        remark_entry = ttk.Entry(date_frame, textvariable=self._reminder_vars['remark'], width=25)
         remark_entry.grid(row=1, column=1, padx=5, pady=5, columnspan=2)
         
         reschedule_button = ttk.Button(reschedule_frame, text="Reschedule Payment",
                                      command=lambda: self.reschedule_payment(
-                                         entry, 
-                                         date_picker.get_date(), 
-                                         remark_var.get(), 
+                                         self._current_reminder,
+                                         self._date_picker.get_date(),
+                                         self._reminder_vars['remark'].get(),
                                          reminder_window
                                      ))
         reschedule_button.pack(fill=tk.X, pady=5)
@@ -443,12 +726,13 @@ class UIHandler:
                 return
                 
             # Update Excel file
-            self.excel_manager.update_payment(
+            saved = self.excel_manager.update_payment(
                 entry['file_path'],
                 entry['row_index'],
                 amount_paid,
                 "Paid"
             )
+            self._files_cache = None
             
             # Send email notification if email is present and email notifier is enabled
             if self.email_notifier and entry.get('Email'):
@@ -466,8 +750,12 @@ class UIHandler:
             # Close the reminder window
             self.close_reminder_window(reminder_window)
             
-            # Update the payment list
-            self.update_list_view()
+            # Update the payment's row in the list, or re-read the file if the save failed
+            if saved:
+                self._patch_list_entry(entry, amount_paid, "Paid")
+            else:
+                self._entries_cache.pop(entry['file_path'], None)
+                self.update_list_view()
             
             # Show the next reminder if any
             self.show_next_reminder()
@@ -482,7 +770,7 @@ class UIHandler:
             formatted_date = new_date.strftime("%Y-%m-%d")
             
             # Update Excel file
-            self.excel_manager.update_payment(
+            saved = self.excel_manager.update_payment(
                 entry['file_path'],
                 entry['row_index'],
                 entry.get('Amount'),
@@ -490,6 +778,7 @@ class UIHandler:
                 new_date,
                 remark if remark else None
             )
+            self._files_cache = None
             
             # Send email notification if email is present and email notifier is enabled
             if self.email_notifier and entry.get('Email'):
@@ -509,8 +798,13 @@ class UIHandler:
             # Close the reminder window
             self.close_reminder_window(reminder_window)
             
-            # Update the payment list
-            self.update_list_view()
+            # Update the payment's row in the list, or re-read the file if the save failed
+            if saved:
+                self._patch_list_entry(entry, entry.get('Amount'), "Rescheduled", new_date,
+                                       remark if remark else None)
+            else:
+                self._entries_cache.pop(entry['file_path'], None)
+                self.update_list_view()
             
             # Show the next reminder if any
             self.show_next_reminder()
@@ -523,8 +817,11 @@ class UIHandler:
         # Find the window in the list and remove it
         self.reminder_windows = [w for w in self.reminder_windows if w['window'] != window]
         
-        # Destroy the window
-        window.destroy()
+        # Hide the shared reminder window so the next reminder can reuse it
+        if window is self._reminder_window:
+            window.withdraw()
+        else:
+            window.destroy()
         
     def show_payment_details(self, event):
         """Show details for a payment when double-clicked"""
@@ -533,12 +830,11 @@ class UIHandler:
         if not selection:
             return
             
-        # Get selected payment values
-        item = self.payment_tree.item(selection[0])
-        values = item['values']
-        
-        if not values:
+        # Look up the selected payment by its row iid
+        entry = self._iid_to_entry.get(selection[0])
+        if entry is None:
             return
+        values = self._row_values(entry)
             
         # Create detail window
         detail_window = tk.Toplevel(self.root)